@@ -1,42 +1,69 @@
 #!/usr/bin/env python
 import argparse
-from mpmath import mp, mpf
+import math
 
-from lib.common import BaseCalc, driver
+from mpmath import mp
 
+from lib.common import driver
+from lib.backends import BackendCalc, number, sqrt, to_mpf
+from lib.checkpoint import ResumableCalc, add_checkpoint_args
+from lib.cache import CachedCalc, add_cache_args
+from lib.options import options_parser, add_backend_arg, add_digits_arg, extra_args
+from lib.stages import StagedCalc, add_stage_args
 
-class calculator(BaseCalc) :
+
+class calculator(CachedCalc, StagedCalc, ResumableCalc, BackendCalc) :
     name = 'archimedes'
     description = 'Approximate pi using inscribed polygons with an increasing number of sides'
 
     digits_per_iter : float = 0.6
 
+    @classmethod
+    def tail_digits(cls, iterations : int) -> float :
+        # pi - s * sin(pi/s) < pi^3 / (6 s^2) for a polygon with s sides
+        sides = 6 * 2**iterations
+        return math.log10(6) + 2 * math.log10(sides) - 3 * math.log10(math.pi)
+
     def __init__(self) -> None:
         """A hexagon inscribe in a unit circle will have side lengh of 1"""
         super().__init__()
-        self.sides = mpf(6)
+        self.sides = number(6)
 
-        self.side_length = mpf(1)
+        self.side_length = number(1)
 
-        self.diameter = mpf(2)
+        self.diameter = number(2)
     
+    def fixed_point_bits(self) -> int :
+        # b = 1 - sqrt(1 - f) is about f/2, which shrinks by 4 each
+        # iteration, so fixed point loses 2 bits of it per iteration. The
+        # iterations that reach mp.prec bits of pi number about mp.prec/2.
+        return mp.prec + 16
+
     def add_term(self) :
         """Use pythagorean theorem twice to figure out the length of the sides
         if you double the number of sides"""
 
-        f = (self.side_length / 2.0)**2
-        b = 1 - mp.sqrt(1 - f)
-        new_len = mp.sqrt(b**2 + f)
+        f = (self.side_length / 2)**2
+        b = 1 - sqrt(1 - f)
+        new_len = sqrt(b**2 + f)
 
         self.side_length = new_len
         self.sides *= 2
 
     def final_compute(self) :
-        return (self.sides * self.side_length) / self.diameter
+        return to_mpf((self.sides * self.side_length) / self.diameter)
     
 
 #--------------------------------------------
 
 if __name__ == "__main__" :
+    parser = options_parser()
+    add_stage_args(parser)
+    add_digits_arg(parser)
+    add_cache_args(parser)
+    add_backend_arg(parser)
+    add_checkpoint_args(parser)
+    extra_args(parser, calculator)
+
     driver(calculator)
 
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+
+#
+# Hex digits of pi from any position, without the digits before it
+# (Bailey-Borwein-Plouffe - see lib/bbp.py).
+#
+#   bbp.py 1000000            16 hex digits from position 1,000,000
+#   bbp.py 1 -n 1000 -w 0     the first 1000, split over every cpu
+#   bbp.py --check run.txt    convert the end of a run's output to hex
+#                             and compare it with extracted digits
+#
+import argparse
+import datetime
+import os
+import sys
+
+from lib.bbp import check_tail, extract, hex_range
+from lib.formatter import read_chunks, unformat
+from lib.verify import is_formatted
+
+name = 'bbp'
+description = 'Hex digits of pi from any position by Bailey-Borwein-Plouffe digit extraction'
+
+def read_digits(path : str) -> str :
+    with open(path) as f :
+        if is_formatted(path) :
+            return ''.join(unformat(f))
+        return ''.join(read_chunks(f))
+
+#--------------------------------------------
+def get_args() :
+    parser = argparse.ArgumentParser(
+                    prog=f"{name}.py",
+                    description=description,
+    )
+
+    parser.add_argument('positions', type=int, nargs='*',
+                        help="Positions after the hex point (1 is the first) to start at")
+    parser.add_argument("-n", '--count', type=int, default=16,
+                        help="Hex digits to give from each position")
+    parser.add_argument("-w", '--workers', type=int, default=1,
+                        help="Number of worker processes to use (0 = one per cpu)")
+    parser.add_argument('--check', metavar='OUTPUT', default=None,
+                        help="Check the last --count hex digits of this run's output")
+
+    args = parser.parse_args()
+    if not args.positions and args.check is None :
+        parser.error("give some positions or --check OUTPUT")
+    for position in args.positions :
+        if position < 1 :
+            parser.error(f"position {position}: the first hex digit after the point is position 1")
+    if args.count < 1 :
+        parser.error("-n/--count must be at least 1")
+
+    return args
+
+if __name__ == "__main__" :
+
+    args = get_args()
+    workers = args.workers or os.cpu_count() or 1
+    start_time = datetime.datetime.now()
+
+    if args.check is not None :
+        digits = read_digits(args.check)
+        result = check_tail(digits, args.count, workers)
+
+        print(f"{result.position:10} {result.converted}  converted from {args.check}")
+        print(f"{result.position:10} {result.extracted}  extracted")
+        print(f"total time = {datetime.datetime.now() - start_time}")
+
+        if result.converted != result.extracted :
+            first = next(i for i, (a, b) in enumerate(zip(result.converted, result.extracted)) if a != b)
+            print(f"MISMATCH from hex digit {result.position + first}")
+            sys.exit(1)
+        print("tail matches")
+
+    elif len(args.positions) == 1 :
+        position = args.positions[0]
+        print(f"{position:10} {hex_range(position, args.count, workers)}")
+        print(f"total time = {datetime.datetime.now() - start_time}")
+
+    else :
+        jobs = [(position, args.count) for position in args.positions]
+        for position, digits in zip(args.positions, extract(jobs, workers)) :
+            print(f"{position:10} {digits}")
+        print(f"total time = {datetime.datetime.now() - start_time}")
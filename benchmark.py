@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+
+#
+# Run every calculator at a ladder of digit targets and record
+# wall time, cpu time, peak memory and how many digits were right.
+#
+# Each run is its own process so that cpu time and peak memory
+# can be measured for just that run. A calculator stops climbing
+# the ladder once a run goes over the time budget.
+#
+# The results are written as JSON. Given an earlier results file
+# as a baseline, any run that is much slower (or gets fewer digits
+# right) than it was is reported and the exit status is 1.
+#
+import argparse
+import datetime
+import glob
+import importlib.util
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from lib.backends import BACKENDS, available
+from lib.planning import plan
+from lib.verify import verify_files
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+REFERENCE = os.path.join(HERE, 'pi-digits-formatted.txt')
+
+CALCULATORS = ['archimedes', 'leibniz', 'nilakantha', 'euler', 'shanks',
+               'machin-*', 'chudnovsky-*', 'gauss-legendre', 'salamin-brent',
+               'borwein-quartic']
+
+# Matched above but not driven by -i or --digits like the rest
+# (machin-disk only takes the digits, and is there to save memory not time)
+EXCLUDE = ['machin-disk']
+
+# Other modes worth timing alongside the default
+VARIANTS : Dict[str, List[List[str]]] = {
+    'machin-like' : [['--fixed']],
+    'machin-like-4' : [['--fixed']],
+    'machin-4-mp' : [['--fixed']],
+    'chudnovsky-bs' : [['--workers', '0']],
+}
+
+DEFAULT_DIGITS = [100, 1000, 10000, 100000, 1000000]
+
+def discover() -> List[str] :
+    names : List[str] = []
+    for pattern in CALCULATORS :
+        for path in sorted(glob.glob(os.path.join(HERE, pattern + '.py'))) :
+            name = os.path.basename(path)[:-3]
+            if name not in names and name not in EXCLUDE :
+                names.append(name)
+    return names
+
+def load(name : str) :
+    """Import a calculator script"""
+    path = os.path.join(HERE, name + '.py')
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_'), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def calculator_class(module) -> Optional[type] :
+    # the calculator class is the one defined here with a digits_per_iter
+    for value in vars(module).values() :
+        if isinstance(value, type) and value.__module__ == module.__name__ \
+                and hasattr(value, 'digits_per_iter') :
+            return value
+    return None
+
+def takes_backend(name : str) -> bool :
+    calc_class = calculator_class(load(name))
+    return calc_class is not None and hasattr(calc_class, 'backend')
+
+def iterations_for(name : str, digits : int) -> Tuple[int, List[str]] :
+    """The iterations a run needs, and the arguments that ask for them.
+    Calculators that can plan their own run are given the digits."""
+    module = load(name)
+    calc_class = calculator_class(module)
+
+    if calc_class is not None and hasattr(calc_class, 'tail_digits') :
+        iterations, _ = plan(calc_class, digits)
+        return iterations, ['--digits', str(digits)]
+
+    if hasattr(module, 'digits_per_iter') :
+        per_iter = module.digits_per_iter
+    elif calc_class is not None :
+        per_iter = calc_class.digits_per_iter
+    else :
+        raise ValueError(f"cannot find digits_per_iter for {name}")
+
+    iterations = max(1, math.ceil(digits / per_iter))
+    return iterations, ['-i', str(iterations)]
+
+def run_once(command : List[str], budget : float) -> Dict[str, Any] :
+    with tempfile.NamedTemporaryFile('w+', suffix='.txt') as out :
+        start = time.perf_counter()
+        proc = subprocess.Popen(command, stdout=out, stderr=subprocess.DEVNULL, cwd=HERE)
+
+        timed_out = False
+        while True :
+            pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+            if pid != 0 :
+                break
+            if time.perf_counter() - start > budget :
+                proc.kill()
+                pid, status, usage = os.wait4(proc.pid, 0)
+                timed_out = True
+                break
+            time.sleep(0.01)
+
+        wall = time.perf_counter() - start
+        # the process was reaped by wait4, let Popen know
+        proc.returncode = os.waitstatus_to_exitcode(status)
+
+        result = {
+            'wall' : wall,
+            'cpu' : usage.ru_utime + usage.ru_stime,
+            # kilobytes on linux
+            'peak_rss_kb' : usage.ru_maxrss,
+            'timed_out' : timed_out,
+            'returncode' : proc.returncode,
+            'verified' : 0,
+        }
+
+        if not timed_out and proc.returncode == 0 :
+            out.flush()
+            result['verified'] = verify_files(out.name, REFERENCE).correct
+
+        return result
+
+def bench(name : str, extra : List[str], ladder : List[int],
+          budget : float, repeats : int) -> List[Dict[str, Any]] :
+    points : List[Dict[str, Any]] = []
+
+    for digits in ladder :
+        iterations, size = iterations_for(name, digits)
+        command = [sys.executable, name + '.py'] + size + extra
+
+        runs = [run_once(command, budget) for _ in range(repeats)]
+        ok = [r for r in runs if not r['timed_out'] and r['returncode'] == 0]
+
+        point = {
+            'digits' : digits,
+            'iterations' : iterations,
+            'runs' : runs,
+            'best_wall' : min(r['wall'] for r in ok) if ok else None,
+            'verified' : max(r['verified'] for r in ok) if ok else 0,
+        }
+        points.append(point)
+
+        best = f"{point['best_wall']:.3f}s" if ok else "over budget/failed"
+        print(f"{name:20} {' '.join(extra):12} {digits:>9} digits {best:>20} verified {point['verified']}")
+
+        if not ok :
+            break
+
+    return points
+
+def compare(results : Dict[str, Any], baseline : Dict[str, Any], tolerance : float) -> List[str] :
+    """List every run that is slower or less accurate than the baseline"""
+    problems : List[str] = []
+
+    for key, points in results['results'].items() :
+        old_points = {p['digits'] : p for p in baseline['results'].get(key, [])}
+        for p in points :
+            old = old_points.get(p['digits'])
+            if old is None or old['best_wall'] is None :
+                continue
+            if p['best_wall'] is None :
+                problems.append(f"{key} @ {p['digits']} digits: now fails or is over budget")
+                continue
+            if p['best_wall'] > old['best_wall'] * (1 + tolerance) :
+                problems.append(f"{key} @ {p['digits']} digits: {p['best_wall']:.3f}s "
+                                f"vs {old['best_wall']:.3f}s in baseline")
+            if p['verified'] < old['verified'] :
+                problems.append(f"{key} @ {p['digits']} digits: {p['verified']} digits verified "
+                                f"vs {old['verified']} in baseline")
+
+    return problems
+
+#--------------------------------------------
+def get_args() :
+    parser = argparse.ArgumentParser(
+                    prog="benchmark.py",
+                    description="Time every calculator at a ladder of digit targets",
+    )
+
+    parser.add_argument('names', nargs='*',
+                        help="Calculators to run (default all of them)")
+    parser.add_argument("-d", '--digits', type=int, nargs='+', default=DEFAULT_DIGITS,
+                        help="Digit targets to run each calculator at")
+    parser.add_argument("-b", '--budget', type=float, default=60.0,
+                        help="Seconds a single run may take")
+    parser.add_argument("-r", '--repeats', type=int, default=3,
+                        help="Times to repeat each run (the best is kept)")
+    parser.add_argument("-o", '--output', default='benchmark.json',
+                        help="Where to write the results")
+    parser.add_argument('--baseline', default=None,
+                        help="Earlier results to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="How much slower than the baseline is a regression")
+    parser.add_argument('--no-variants', action='store_true',
+                        help="Only run each calculator in its default mode")
+    parser.add_argument('--backends', nargs='+', default=[],
+                        choices=sorted(BACKENDS) + ['available'],
+                        help="Also run the calculators that take --backend with each of these "
+                             "('available' for all those installed here)")
+
+    return parser.parse_args()
+
+if __name__ == "__main__" :
+
+    args = get_args()
+
+    names = args.names or discover()
+
+    backends = available() if 'available' in args.backends else args.backends
+
+    results : Dict[str, Any] = {
+        'date' : datetime.datetime.now().isoformat(),
+        'host' : platform.node(),
+        'machine' : platform.machine(),
+        'processor' : platform.processor(),
+        'cpus' : os.cpu_count(),
+        'python' : platform.python_version(),
+        'budget' : args.budget,
+        'repeats' : args.repeats,
+        'results' : {},
+    }
+
+    for name in names :
+        modes = [[]]
+        if not args.no_variants :
+            modes += VARIANTS.get(name, [])
+        if backends and takes_backend(name) :
+            modes += [['--backend', b] for b in backends if b != 'mpmath']
+
+        for extra in modes :
+            key = ' '.join([name] + extra)
+            try :
+                results['results'][key] = bench(name, extra, sorted(args.digits),
+                                                args.budget, args.repeats)
+            except Exception as e :
+                print(f"{key:20} skipped - {e}")
+
+    with open(args.output, 'w') as f :
+        json.dump(results, f, indent=2)
+
+    if args.baseline is not None :
+        with open(args.baseline) as f :
+            baseline = json.load(f)
+
+        problems = compare(results, baseline, args.tolerance)
+        if problems :
+            print()
+            print("*** PERFORMANCE REGRESSION ***")
+            for p in problems :
+                print(p)
+            sys.exit(1)
+
+        print(f"no regressions against {args.baseline}")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+from lib.common import driver
+from lib.backends import BackendCalc, divide, reciprocal, sqrt, to_mpf
+from lib.cache import CachedCalc, add_cache_args
+from lib.options import options_parser, add_backend_arg, add_digits_arg, extra_args
+from lib.progress import ProgressCalc, add_progress_arg
+from lib.planning import borwein_quartic_tail_digits
+from lib.stages import StagedCalc, add_stage_args
+
+
+class calculator(CachedCalc, StagedCalc, ProgressCalc, BackendCalc) :
+    name = 'borwein-quartic'
+    description = "Approximate pi using the Borweins' quartically convergent iteration"
+
+    # only the first iteration - see size_by_tail in lib/options.py
+    digits_per_iter = 8
+    size_by_tail = True
+
+    @classmethod
+    def tail_digits(cls, iterations : int) -> float :
+        return borwein_quartic_tail_digits(iterations)
+
+    def __init__(self) -> None:
+        super().__init__()
+        root_2 = sqrt(2)
+        self.a = 6 - 4 * root_2
+        self.y = root_2 - 1
+        # 2^(2k+3)
+        self.two_power = 8
+
+    def add_term(self) :
+        root = sqrt(sqrt(1 - self.y**4))
+        y = divide(1 - root, 1 + root)
+
+        self.a = self.a * (1 + y)**4 - self.two_power * y * (1 + y + y*y)
+        self.y = y
+        self.two_power *= 4
+
+    def final_compute(self) :
+        # a converges to 1/pi
+        return to_mpf(reciprocal(self.a))
+
+
+if __name__ == "__main__" :
+    parser = options_parser()
+    add_stage_args(parser)
+    add_digits_arg(parser)
+    add_cache_args(parser)
+    add_backend_arg(parser)
+    add_progress_arg(parser)
+    extra_args(parser, calculator)
+
+    driver(calculator)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+from lib.common import driver
+from lib.binsplit import chudnovsky_split, chudnovsky_split_parallel, chudnovsky_pi, watch
+from lib.cluster import add_cluster_args, cluster
+from lib.cache import CachedCalc, add_cache_args
+from lib.options import options_parser, add_digits_arg, add_workers_arg, extra_args
+from lib.planning import chudnovsky_tail_digits
+from lib.stages import StagedCalc, add_stage_args
+
+class calculator(CachedCalc, StagedCalc) :
+    name = 'chudnovsky-bs'
+    description = 'Approximate pi using a chudnovsky formula evaluated by binary splitting'
+    digits_per_iter = 14.18
+
+    workers : int = 1
+
+    @classmethod
+    def tail_digits(cls, iterations : int) -> float :
+        # term 0 plus one term per iteration
+        return chudnovsky_tail_digits(iterations + 1)
+
+    def approx_pi(self) :
+        return self.cached(lambda : self.run_stages(self.binary_split))
+
+    def binary_split(self) :
+        # term 0 plus one term per iteration, the same as chudnovsky-iter2
+        terms = self.iterations + 1
+
+        # P, Q and T are locals here, so they are handed to the report
+        record = self.instrument.record if self.instrument is not None else None
+
+        with self.phase('split'), watch(record), cluster(self) as pool :
+            if self.workers > 1 or pool is not None :
+                p, q, t = chudnovsky_split_parallel(0, terms, self.workers, pool)
+            else :
+                p, q, t = chudnovsky_split(0, terms)
+
+        with self.phase('final') :
+            return chudnovsky_pi(q, t)
+
+
+if __name__ == "__main__" :
+    parser = options_parser()
+    add_stage_args(parser)
+    add_digits_arg(parser)
+    add_cache_args(parser)
+    add_workers_arg(parser)
+    add_cluster_args(parser)
+    extra_args(parser, calculator)
+
+    driver(calculator)
@@ -1,33 +1,40 @@
 #!/usr/bin/env python
-from mpmath import mp, mpf
-
-from lib.common import BaseCalc, driver
-
-class calculator(BaseCalc) :
-    name = 'chudnovsky-iter'
+from lib.common import driver
+from lib.backends import BackendCalc, inv_sqrt, number, reciprocal, to_mpf
+from lib.checkpoint import ResumableCalc, add_checkpoint_args
+from lib.cache import CachedCalc, add_cache_args
+from lib.options import options_parser, add_backend_arg, add_digits_arg, extra_args
+from lib.planning import chudnovsky_tail_digits
+from lib.stages import StagedCalc, add_stage_args
+
+class calculator(CachedCalc, StagedCalc, ResumableCalc, BackendCalc) :
+    name = 'chudnovsky-iter2'
     description = 'Approximate pi using a chudnovsky formula'
     digits_per_iter = 10
 
+    @classmethod
+    def tail_digits(cls, iterations : int) -> float :
+        # term 0 plus one term per iteration
+        return chudnovsky_tail_digits(iterations + 1)
+
     def __init__(self) -> None:
         super().__init__()
 
-        self.front_factor = mpf(1) / (mpf(426880) * mp.sqrt('10005'))
+        self.front_factor = inv_sqrt(10005) / 426880
 
-        self.back_sum = mpf('13591409')
-        self.back_sum_a = mpf('545140134')
+        self.back_sum = 13591409
+        self.back_sum_a = 545140134
 
-        self.bottom_factor = mpf('10939058860032000')
+        self.bottom_factor = 10939058860032000
 
-        self.total_multiplicand = mpf(1)
+        self.total_multiplicand = number(1)
 
         # f(0)
-        self.total_sum = mpf('13591409')
+        self.total_sum = number(13591409)
 
     def compute_next_multiplicand(self, j : int) :
-        j_mp = mpf(j)
-
-        return -(j_mp * 6.0 - 1.0) * ( j_mp*2.0 - 1.0) *( j_mp * 6.0 - 5.0) / \
-                (self.bottom_factor * mp.power(j_mp, 3))
+        return number(-(j * 6 - 1) * (j * 2 - 1) * (j * 6 - 5)) / \
+                (self.bottom_factor * j**3)
     
     
     def add_term(self) :
@@ -39,8 +46,16 @@ class calculator(BaseCalc) :
         self.total_sum += new_term
 
     def final_compute(self) :
-        return mpf(1) / (self.total_sum * self.front_factor)
+        return to_mpf(reciprocal(self.total_sum * self.front_factor))
     
 
 if __name__ == "__main__" :
+    parser = options_parser()
+    add_stage_args(parser)
+    add_digits_arg(parser)
+    add_cache_args(parser)
+    add_backend_arg(parser)
+    add_checkpoint_args(parser)
+    extra_args(parser, calculator)
+
     driver(calculator)
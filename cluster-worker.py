@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+
+#
+# Do work units for a calculator run with --listen (see lib/cluster.py).
+#
+# Start one of these on each machine to be used, with the same
+# COMPUTE_PI_AUTHKEY in the environment as the coordinator. It waits
+# for the coordinator to come up, runs WORKERS processes that each
+# take units until there are none left, and then exits.
+#
+import argparse
+import datetime
+import os
+import sys
+
+from lib.cluster import ClusterError, authkey, parse_address, run_worker, start_local_workers
+
+def get_args() :
+    parser = argparse.ArgumentParser(
+                    prog="cluster-worker.py",
+                    description="Work for a calculator started with --listen",
+    )
+
+    parser.add_argument('coordinator', metavar='HOST:PORT',
+                        help="Where the coordinator is listening")
+    parser.add_argument("-w", '--workers', type=int, default=0,
+                        help="Number of worker processes to run (0 = one per cpu)")
+
+    return parser.parse_args()
+
+if __name__ == "__main__" :
+
+    args = get_args()
+
+    try :
+        key = authkey()
+    except ClusterError as e :
+        sys.exit(str(e))
+
+    address = parse_address(args.coordinator)
+    start_time = datetime.datetime.now()
+
+    workers = args.workers or os.cpu_count() or 1
+    if workers == 1 :
+        done = run_worker(address, key)
+        print(f"{done} units done")
+    else :
+        for w in start_local_workers(address, key, workers) :
+            w.join()
+
+    print(f"total time = {datetime.datetime.now() - start_time}")
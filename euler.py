@@ -1,24 +1,51 @@
 #!/usr/bin/env python
-from mpmath import mpf
+import math
+from mpmath import mp, mpf
 
-from lib.common import BaseCalc, driver
+from lib.common import driver
+from lib.backends import BackendCalc, number, to_mpf
+from lib.checkpoint import ResumableCalc, add_checkpoint_args
+from lib.cache import CachedCalc, add_cache_args
+from lib.options import options_parser, add_backend_arg, add_digits_arg, add_split_arg, add_workers_arg, extra_args
+from lib.series import Series, SplitCalc
+from lib.stages import StagedCalc, add_stage_args
 
 
-class calculator(BaseCalc) :
+class EulerSeries(Series) :
+    """2^(n+1) * n!^2 / (2n+1)! - each term is the one before times n / (2n+1)"""
+    def a(self, n : int) -> int :
+        return 2
+
+    def p(self, n : int) -> int :
+        return n if n > 0 else 1
+
+    def q(self, n : int) -> int :
+        return 2*n + 1
+
+
+class calculator(CachedCalc, StagedCalc, SplitCalc, ResumableCalc, BackendCalc) :
     name = 'euler'
     description = 'Approximate pi using euler transform power series'
 
     digits_per_iter = .30
 
+    @classmethod
+    def tail_digits(cls, iterations : int) -> float :
+        # each term is less than half the one before it, so the
+        # tail is less than twice the next term 2^(k+1) * k!^2 / (2k+1)!
+        k = iterations + 1
+        log_term = (k+1) * math.log(2) + 2 * math.lgamma(k+1) - math.lgamma(2*k + 2)
+        return -(log_term / math.log(10) + math.log10(2))
+
     def __init__(self) -> None:
         super().__init__(first_iter=1)
 
         # pull of the first term (k=0) so we don't
         # have to deal with things like 0!
-        self.total_sum = mpf(2)
-        self.k_fact = mpf(1)
-        self.two_power = mpf(2)
-        self.denom_fact = mpf(1)
+        self.total_sum = number(2)
+        self.k_fact = number(1)
+        self.two_power = number(2)
+        self.denom_fact = number(1)
 
     
     def add_term(self) :
@@ -31,11 +58,37 @@ class calculator(BaseCalc) :
         self.total_sum += new_term
 
     def final_compute(self) :
-        return self.total_sum
+        return to_mpf(self.total_sum)
+
+    def sum_terms(self, a : int, b : int) :
+        # term k is 2^(k+1) * k!^2 / (2k+1)!
+        # so each term is the one before it times (k+1) / (2k+3)
+        new_term = mpf(2)**(a+1) * mp.factorial(a)**2 / mp.factorial(2*a + 1)
+        total = mpf(0)
+        for k in range(a, b) :
+            total += new_term
+            new_term = new_term * (k+1) / (2*k + 3)
+
+        return total
+
+    def split_series(self) :
+        return [(1, EulerSeries(), self.iterations + self.initial_terms)]
+
+    def final_from_sum(self, total) :
+        return total
         
 
 
 if __name__ == "__main__" :
+    parser = options_parser()
+    add_stage_args(parser)
+    add_digits_arg(parser)
+    add_cache_args(parser)
+    add_backend_arg(parser)
+    add_split_arg(parser)
+    add_workers_arg(parser)
+    add_checkpoint_args(parser)
+    extra_args(parser, calculator)
 
     driver(calculator)
 
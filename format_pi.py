@@ -5,29 +5,30 @@
 # 10 groups per line. Add a group count along the left
 # margin.
 #
+# With --unformat, turn the formatted layout back into
+# one long digit string.
+#
+import argparse
 import sys
-from typing import List
 
-digits = sys.stdin.read()
+from lib.formatter import read_chunks, unformat, write_formatted, write_plain
 
-# number of digits per group
-dpg : int = 10
-# number of groups per line
-gpl : int = 10
+def get_args() :
+    parser = argparse.ArgumentParser(
+                    prog="format_pi.py",
+                    description="Format a digit string read from stdin into groups of 10",
+    )
 
-leading : str = ''
-trailing : str = ''
-[leading, trailing] = digits.split('.', 2)
+    parser.add_argument("-u", '--unformat', action='store_true',
+                        help="Turn formatted digits back into a plain string")
 
-prefix : str = ' ' * (len(leading)+1)
+    return parser.parse_args()
 
-groups : List[str] = [trailing[start:start+dpg] for start in range(0, len(trailing), dpg)]
+if __name__ == "__main__" :
 
-n : int = 0
-groups[0] = f"{n:6}|" + leading + '.' + groups[0]
-for i in range(gpl, len(groups), gpl) :
-    n += gpl
-    groups[i] = f"{n:6}|" + prefix + groups[i]
+    args = get_args()
 
-for i in range(0, len(groups), gpl) :
-    print(" ".join(groups[i:i+10]))
+    if args.unformat :
+        write_plain(unformat(sys.stdin))
+    else :
+        write_formatted(read_chunks(sys.stdin))
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+from lib.common import driver
+from lib.backends import BackendCalc, divide, inv_sqrt, number, sqrt, to_mpf
+from lib.cache import CachedCalc, add_cache_args
+from lib.options import options_parser, add_backend_arg, add_digits_arg, extra_args
+from lib.progress import ProgressCalc, add_progress_arg
+from lib.planning import gauss_legendre_tail_digits
+from lib.stages import StagedCalc, add_stage_args
+
+
+class calculator(CachedCalc, StagedCalc, ProgressCalc, BackendCalc) :
+    name = 'gauss-legendre'
+    description = 'Approximate pi using the Gauss-Legendre arithmetic-geometric mean iteration'
+
+    # only the first iteration - see size_by_tail in lib/options.py
+    digits_per_iter = 2.5
+    size_by_tail = True
+
+    @classmethod
+    def tail_digits(cls, iterations : int) -> float :
+        return gauss_legendre_tail_digits(iterations)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.a = number(1)
+        self.b = inv_sqrt(2)
+        self.t = number(1) / 4
+        self.p = 1
+
+    def add_term(self) :
+        """Replace a and b by their arithmetic and geometric means"""
+        a = (self.a + self.b) / 2
+        self.b = sqrt(self.a * self.b)
+        self.t -= self.p * (self.a - a)**2
+        self.a = a
+        self.p *= 2
+
+    def final_compute(self) :
+        return to_mpf(divide((self.a + self.b)**2, 4 * self.t))
+
+
+if __name__ == "__main__" :
+    parser = options_parser()
+    add_stage_args(parser)
+    add_digits_arg(parser)
+    add_cache_args(parser)
+    add_backend_arg(parser)
+    add_progress_arg(parser)
+    extra_args(parser, calculator)
+
+    driver(calculator)
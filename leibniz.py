@@ -2,37 +2,91 @@
 import argparse
 from mpmath import mpf
 
-from lib.common import BaseCalc, driver
+from lib.common import driver
+from lib.backends import BackendCalc, number, to_mpf
+from lib.batch import BatchCalc
+from lib.epsilon import EpsilonCalc
+from lib.checkpoint import ResumableCalc, add_checkpoint_args
+from lib.cache import CachedCalc, add_cache_args
+from lib.options import options_parser, add_backend_arg, add_batch_arg, add_digits_arg, add_layers_arg, add_split_arg, add_workers_arg, extra_args
+from lib.series import Series, SplitCalc
+from lib.planning import alternating_tail_digits
+from lib.stages import StagedCalc, add_stage_args
 
 
-class calculator(BaseCalc) :
+class LeibnizSeries(Series) :
+    """(-1)^n / (2n+1)"""
+    def a(self, n : int) -> int :
+        return -1 if n & 1 else 1
+
+    def b(self, n : int) -> int :
+        return 2*n + 1
+
+
+class calculator(CachedCalc, EpsilonCalc, StagedCalc, BatchCalc, SplitCalc, ResumableCalc, BackendCalc) :
     name = 'leibniz'
     description = 'Approximate pi using Leibniz power series'
 
     digits_per_iter = 0.00001
 
+    @classmethod
+    def tail_digits(cls, iterations : int) -> float :
+        # off by less than the next term, 4 / (2n+3)
+        return alternating_tail_digits(4 / (2*iterations + 3))
+
     def __init__(self) -> None:
         super().__init__()
-        self.n = mpf(1)
+        self.n = number(1)
         self.sign : int = 1
-        self.total_sum = mpf(1)
+        self.total_sum = number(1)
 
     
     def add_term(self) :
         self.n += 2
 
-        new_term = mpf(1) / (self.n)
+        new_term = 1 / self.n
 
         self.sign *= -1
 
         self.total_sum += new_term * self.sign
 
     def final_compute(self) :
-        return self.total_sum * 4
+        return to_mpf(self.total_sum * 4)
+
+    def sum_terms(self, a : int, b : int) :
+        total = mpf(0)
+        for k in range(a, b) :
+            new_term = mpf(1) / (2*k + 1)
+            if k & 1 :
+                total -= new_term
+            else :
+                total += new_term
+
+        return total
+
+    def batch_terms(self, k) :
+        return (1 - 2*(k & 1)) / (2.0*k + 1)
+
+    def split_series(self) :
+        return [(1, LeibnizSeries(), self.iterations + self.initial_terms)]
+
+    def final_from_sum(self, total) :
+        return total * 4
     
 
 
 if __name__ == "__main__" :
+    parser = options_parser()
+    add_stage_args(parser)
+    add_digits_arg(parser)
+    add_cache_args(parser)
+    add_backend_arg(parser)
+    add_layers_arg(parser)
+    add_batch_arg(parser)
+    add_split_arg(parser)
+    add_workers_arg(parser)
+    add_checkpoint_args(parser)
+    extra_args(parser, calculator)
 
     driver(calculator)
 
@@ -0,0 +1,348 @@
+#
+# Arithmetic backends.
+#
+# The calculators build their numbers with number() and use the
+# operators on them, plus sqrt, inv_sqrt, reciprocal and divide from
+# here. Which kind of number that is depends on the backend chosen
+# with --backend :
+#
+#   mpmath   - mpmath.mpf (the default)
+#   bigfloat - MPFR through the bigfloat package
+#   gmpy2    - MPFR through gmpy2.mpfr
+#   mpz      - binary fixed point on gmpy2.mpz
+#   python   - binary fixed point on plain python ints
+#
+# Whatever the backend, final_compute hands back to_mpf(result) so
+# the rest (verification, formatting, Wynn's epsilon) sees an mpf.
+#
+# The precision is taken from mpmath's when the calculator is created
+# (BackendCalc calls prepare()), so `driver`'s -p and the planning code
+# work the same for every backend.
+#
+# bigfloat and gmpy2 are only imported when they are asked for.
+#
+import math
+from typing import Dict, List, Type
+
+from mpmath import mp, mpf, workdps
+from mpmath.libmp import MPZ, dps_to_prec
+
+from lib.common import BaseCalc
+from lib import newton
+
+# Fixed point values truncate on every division, so carry some bits
+# beyond the precision mpmath would use.
+FIXED_GUARD_BITS = 32
+
+class Backend :
+    name : str = ''
+    # numbers are integers on one fixed scale, not floating point
+    fixed_point : bool = False
+    # bits a fixed point backend carries beyond the precision asked for
+    extra_bits : int = 0
+
+    def set_precision(self, bits : int) -> None :
+        pass
+
+    def working_precision(self, dps : int) :
+        """Context manager that computes at dps digits for a while"""
+        pass
+
+    def number(self, value) :
+        """value (an int, float, str or mpf) as this backend's number"""
+        pass
+
+    def sqrt(self, x) :
+        pass
+
+    def inv_sqrt(self, x) :
+        return 1 / self.sqrt(x)
+
+    def reciprocal(self, x) :
+        return 1 / x
+
+    def divide(self, a, b) :
+        return a / b
+
+    def to_mpf(self, x) :
+        """x as an mpf at the current mpmath precision"""
+        pass
+
+class MpmathBackend(Backend) :
+    name = 'mpmath'
+
+    def set_precision(self, bits : int) -> None :
+        pass
+
+    def working_precision(self, dps : int) :
+        return workdps(dps)
+
+    def number(self, value) :
+        return mpf(value)
+
+    def sqrt(self, x) :
+        return newton.sqrt(x)
+
+    def inv_sqrt(self, x) :
+        return newton.inv_sqrt(x)
+
+    def reciprocal(self, x) :
+        return newton.reciprocal(x)
+
+    def divide(self, a, b) :
+        return newton.divide(a, b)
+
+    def to_mpf(self, x) :
+        return +mpf(x)
+
+class BigFloatBackend(Backend) :
+    name = 'bigfloat'
+
+    def __init__(self) -> None:
+        import bigfloat
+        self.bigfloat = bigfloat
+
+    def set_precision(self, bits : int) -> None :
+        self.bigfloat.setcontext(self.bigfloat.precision(bits))
+
+    def working_precision(self, dps : int) :
+        return self.bigfloat.precision(dps_to_prec(dps))
+
+    def number(self, value) :
+        if isinstance(value, mpf) :
+            return self.bigfloat.BigFloat(str(value))
+        return self.bigfloat.BigFloat(value)
+
+    def sqrt(self, x) :
+        return self.bigfloat.sqrt(x)
+
+    def to_mpf(self, x) :
+        if isinstance(x, mpf) :
+            return +x
+        numerator, denominator = x.as_integer_ratio()
+        return mpf(numerator) / denominator
+
+class Gmpy2Backend(Backend) :
+    name = 'gmpy2'
+
+    def __init__(self) -> None:
+        import gmpy2
+        self.gmpy2 = gmpy2
+
+    def set_precision(self, bits : int) -> None :
+        self.gmpy2.get_context().precision = bits
+
+    def working_precision(self, dps : int) :
+        return self.gmpy2.local_context(precision=dps_to_prec(dps))
+
+    def number(self, value) :
+        if isinstance(value, mpf) :
+            man, exp = value.man_exp
+            return self.gmpy2.mul_2exp(self.gmpy2.mpfr(man), exp)
+        return self.gmpy2.mpfr(value)
+
+    def sqrt(self, x) :
+        return self.gmpy2.sqrt(x)
+
+    def inv_sqrt(self, x) :
+        return self.gmpy2.rec_sqrt(x)
+
+    def to_mpf(self, x) :
+        if isinstance(x, mpf) :
+            return +x
+        man, exp = self.gmpy2.mpfr(x).as_mantissa_exp()
+        return mpf((int(man), int(exp)))
+
+class Fixed :
+    """A binary fixed point number: the integer v stands for v / 2**bits.
+    All values share the one scale, set by the backend."""
+    __slots__ = ('v',)
+
+    bits : int = 0
+
+    def __init__(self, v) -> None:
+        self.v = v
+
+    def __add__(self, other) :
+        if isinstance(other, Fixed) :
+            return Fixed(self.v + other.v)
+        return Fixed(self.v + (other << Fixed.bits))
+
+    __radd__ = __add__
+
+    def __sub__(self, other) :
+        if isinstance(other, Fixed) :
+            return Fixed(self.v - other.v)
+        return Fixed(self.v - (other << Fixed.bits))
+
+    def __rsub__(self, other) :
+        return Fixed((other << Fixed.bits) - self.v)
+
+    def __mul__(self, other) :
+        if isinstance(other, Fixed) :
+            return Fixed((self.v * other.v) >> Fixed.bits)
+        return Fixed(self.v * other)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other) :
+        if isinstance(other, Fixed) :
+            return Fixed((self.v << Fixed.bits) // other.v)
+        return Fixed(self.v // other)
+
+    def __rtruediv__(self, other) :
+        return Fixed((other << (2 * Fixed.bits)) // self.v)
+
+    def __pow__(self, n : int) :
+        result = None
+        square = self
+        while n :
+            if n & 1 :
+                result = square if result is None else result * square
+            n >>= 1
+            if n :
+                square = square * square
+        return Fixed(MPZ(1) << Fixed.bits) if result is None else result
+
+    def __neg__(self) :
+        return Fixed(-self.v)
+
+    def __pos__(self) :
+        return self
+
+    def __abs__(self) :
+        return Fixed(abs(self.v))
+
+    def _value(self, other) :
+        return other.v if isinstance(other, Fixed) else other << Fixed.bits
+
+    def __eq__(self, other) :
+        return self.v == self._value(other)
+
+    def __lt__(self, other) :
+        return self.v < self._value(other)
+
+    def __le__(self, other) :
+        return self.v <= self._value(other)
+
+    def __gt__(self, other) :
+        return self.v > self._value(other)
+
+    def __ge__(self, other) :
+        return self.v >= self._value(other)
+
+    __hash__ = None
+
+    def __float__(self) :
+        return float(mpf((int(self.v), -Fixed.bits)))
+
+    def __repr__(self) :
+        return f"Fixed({self.v}, bits={Fixed.bits})"
+
+class MpzBackend(Backend) :
+    name = 'mpz'
+    fixed_point = True
+
+    def __init__(self) -> None:
+        import gmpy2
+        self.integer = gmpy2.mpz
+        self.isqrt = gmpy2.isqrt
+
+    def set_precision(self, bits : int) -> None :
+        Fixed.bits = bits + FIXED_GUARD_BITS + self.extra_bits
+
+    def number(self, value) :
+        if isinstance(value, int) :
+            return Fixed(self.integer(value) << Fixed.bits)
+
+        man, exp = mpf(value).man_exp
+        shift = Fixed.bits + exp
+        man = self.integer(man)
+        return Fixed(man << shift if shift >= 0 else man >> -shift)
+
+    def sqrt(self, x) :
+        if not isinstance(x, Fixed) :
+            x = self.number(x)
+        return Fixed(self.isqrt(x.v << Fixed.bits))
+
+    def to_mpf(self, x) :
+        if isinstance(x, mpf) :
+            return +x
+        return +mpf((int(x.v), -Fixed.bits))
+
+class PythonBackend(MpzBackend) :
+    name = 'python'
+
+    def __init__(self) -> None:
+        self.integer = int
+        self.isqrt = math.isqrt
+
+BACKENDS : Dict[str, Type[Backend]] = {
+    'mpmath' : MpmathBackend,
+    'bigfloat' : BigFloatBackend,
+    'gmpy2' : Gmpy2Backend,
+    'mpz' : MpzBackend,
+    'python' : PythonBackend,
+}
+
+current : Backend = MpmathBackend()
+
+def available() -> List[str] :
+    """The backends whose packages are installed here"""
+    names : List[str] = []
+    for name, backend in BACKENDS.items() :
+        try :
+            backend()
+        except ImportError :
+            continue
+        names.append(name)
+    return names
+
+def use(name : str) -> None :
+    """Make name the backend (ImportError if its package is missing)"""
+    global current
+    current = BACKENDS[name]()
+
+def prepare(extra_bits : int = 0) -> Backend :
+    """Match the backend's precision to mpmath's. A fixed point
+    backend also carries extra_bits more."""
+    if current.fixed_point :
+        current.extra_bits = extra_bits
+    current.set_precision(mp.prec)
+    return current
+
+def working_precision(dps : int) :
+    return current.working_precision(dps)
+
+def number(value) :
+    return current.number(value)
+
+def sqrt(x) :
+    return current.sqrt(x)
+
+def inv_sqrt(x) :
+    return current.inv_sqrt(x)
+
+def reciprocal(x) :
+    return current.reciprocal(x)
+
+def divide(a, b) :
+    return current.divide(a, b)
+
+def to_mpf(x) :
+    return current.to_mpf(x)
+
+class BackendCalc(BaseCalc) :
+    """A calculator whose arithmetic goes through the chosen backend.
+    Build the numbers with number() after calling super().__init__()
+    and return to_mpf() of the result from final_compute."""
+    backend : str = 'mpmath'
+
+    def __init__(self, *args, **kwargs) -> None:
+        prepare(self.fixed_point_bits())
+        super().__init__(*args, **kwargs)
+
+    def fixed_point_bits(self) -> int :
+        """Bits to carry beyond mp.prec when the numbers are fixed point
+        - for a calculator whose values shrink far below 1"""
+        return 0
@@ -0,0 +1,94 @@
+#
+# Low precision batch mode for the slowly converging series.
+#
+# Rather than one mpf term per add_term call, the terms are computed
+# as float64 in large NumPy blocks. Each block is summed pairwise (which
+# is what numpy.sum does) and the block sums are added with Neumaier's
+# compensated summation, so the rounding error stays near one unit in
+# the last place however many blocks there are.
+#
+# That is good for about 15 digits - plenty for watching a series that
+# needs billions of terms for 10 digits converge.
+#
+# numpy is only needed when the batch mode is used.
+#
+from multiprocessing import Pool
+from typing import Tuple
+
+from mpmath import mpf
+
+from lib.parallel import RangeCalc
+from lib.progress import Progress
+
+BLOCK_SIZE : int = 1 << 21
+
+class CompensatedSum :
+    """Neumaier's variant of Kahan summation"""
+    def __init__(self) -> None:
+        self.total = 0.0
+        self.compensation = 0.0
+
+    def add(self, value : float) -> None :
+        total = self.total + value
+        if abs(self.total) >= abs(value) :
+            self.compensation += (self.total - total) + value
+        else :
+            self.compensation += (value - total) + self.total
+        self.total = total
+
+    def value(self) -> float :
+        return self.total + self.compensation
+
+def block_sum(calc : 'BatchCalc', a : int, b : int) -> float :
+    """Sum of the terms [a, b) as one block"""
+    import numpy as np
+
+    k = np.arange(a, b, dtype=np.int64)
+    return float(np.sum(calc.batch_terms(k)))
+
+def _sum_blocks(job : Tuple['BatchCalc', int, int]) -> Tuple[float, float] :
+    calc, a, b = job
+    total = CompensatedSum()
+    for start in range(a, b, BLOCK_SIZE) :
+        total.add(block_sum(calc, start, min(start + BLOCK_SIZE, b)))
+    return total.total, total.compensation
+
+class BatchCalc(RangeCalc) :
+    """A calculator whose terms can be computed for a whole numpy array
+    of indices at once by batch_terms(k).
+
+    With batch set the terms [0, iterations + initial_terms) are
+    summed in float64 blocks and the total handed to final_from_sum."""
+    batch : bool = False
+
+    def batch_terms(self, k) :
+        """float64 array of the terms with the indices in the int64 array k"""
+        pass
+
+    def approx_pi(self) :
+        if not self.batch :
+            return super().approx_pi()
+
+        terms = self.iterations + self.initial_terms
+        total = CompensatedSum()
+
+        if self.workers > 1 :
+            # whole runs of blocks for each worker
+            pieces = min(-(-terms // BLOCK_SIZE), self.workers * 4)
+            bounds = [terms * i // pieces for i in range(pieces + 1)]
+            jobs = [(self, a, b) for a, b in zip(bounds, bounds[1:])]
+
+            with Pool(self.workers) as pool, \
+                    Progress(pieces, self.report_every, unit='chunks') as progress :
+                for i, (part, compensation) in enumerate(pool.imap(_sum_blocks, jobs)) :
+                    total.add(part)
+                    total.add(compensation)
+                    progress.count = i + 1
+        else :
+            blocks = -(-terms // BLOCK_SIZE)
+            with Progress(blocks, self.report_every, unit='blocks') as progress :
+                for i, start in enumerate(range(0, terms, BLOCK_SIZE)) :
+                    total.add(block_sum(self, start, min(start + BLOCK_SIZE, terms)))
+                    progress.count = i + 1
+
+        return self.final_from_sum(mpf(total.value()))
@@ -0,0 +1,112 @@
+#
+# Bailey-Borwein-Plouffe digit extraction.
+#
+#   pi = sum over k of 1/16^k * (4/(8k+1) - 2/(8k+4) - 1/(8k+5) - 1/(8k+6))
+#
+# Multiply by 16^d and only the fraction matters for the hex digits
+# after position d. For the terms with k <= d the whole part of
+# 16^(d-k) / (8k+j) can be dropped by working mod 8k+j - so each is a
+# modular power of 16 and one small division. The terms after that
+# shrink by 16 each, and only the few that reach the digits wanted
+# are added. Nothing before position d is ever computed.
+#
+# The fractions are kept as fixed point integers with enough guard bits
+# for the truncation of every term, so a single position can give a
+# whole run of digits. The cost is d modular powers, whatever the
+# run's length, and positions (or pieces of a long run) are
+# independent so they can go to a pool of processes.
+#
+# check_tail() turns the end of a decimal run into hex and compares it
+# with digits extracted here - an independent check of the last digits
+# of a long run for a small fraction of its cost.
+#
+import math
+from multiprocessing import Pool
+from typing import List, NamedTuple, Optional, Tuple
+
+from mpmath.libmp import MPZ
+
+from lib.radix import int_from_digits
+
+# (j, weight) of each series in the formula
+SERIES : List[Tuple[int, int]] = [(1, 4), (4, -2), (5, -1), (6, -1)]
+
+# Hex digits left off the end of a decimal run converted to hex, in
+# case the decimal digits that were cut off carry into them.
+HEX_GUARD = 2
+
+def pi_fraction(d : int, bits : int) -> int :
+    """frac(16^d * pi) as a fixed point integer (value * 2^bits),
+    give or take d + bits units in the last place"""
+    one = 1 << bits
+    total = 0
+
+    for k in range(d + 1) :
+        e = d - k
+        m = 8 * k
+        for j, weight in SERIES :
+            total += weight * ((pow(16, e, m + j) << bits) // (m + j))
+
+    # 16^(d-k) / (8k+j) for k > d, while they still reach the bits kept
+    k = d + 1
+    shift = bits - 4
+    while shift > 0 :
+        for j, weight in SERIES :
+            total += weight * ((1 << shift) // (8*k + j))
+        k += 1
+        shift -= 4
+
+    return total % one
+
+def hex_digits(position : int, count : int) -> str :
+    """`count` hex digits of pi starting at `position` places after the point"""
+    d = position - 1
+    guard = (d + 4 * count).bit_length() + 8
+    fraction = pi_fraction(d, 4 * count + guard) >> guard
+    return format(fraction, 'X').zfill(count)
+
+def _extract(job : Tuple[int, int]) -> str :
+    return hex_digits(*job)
+
+def extract(jobs : List[Tuple[int, int]], workers : int = 1) -> List[str] :
+    """hex_digits for each (position, count)"""
+    if workers <= 1 or len(jobs) <= 1 :
+        return [_extract(job) for job in jobs]
+
+    # the furthest positions take longest, so start them first
+    order = sorted(range(len(jobs)), key=lambda i : -jobs[i][0])
+    results : List[Optional[str]] = [None] * len(jobs)
+    with Pool(workers) as pool :
+        for i, digits in zip(order, pool.imap(_extract, [jobs[i] for i in order], chunksize=1)) :
+            results[i] = digits
+    return results
+
+def hex_range(position : int, count : int, workers : int = 1) -> str :
+    """`count` hex digits from `position`, cut into a piece per worker"""
+    pieces = max(1, min(count, workers))
+    bounds = [count * i // pieces for i in range(pieces + 1)]
+    jobs = [(position + a, b - a) for a, b in zip(bounds, bounds[1:])]
+    return ''.join(extract(jobs, workers))
+
+TailCheck = NamedTuple('TailCheck', position=int, converted=str, extracted=str)
+
+def decimal_to_hex_tail(digits : str, count : int) -> Tuple[int, str] :
+    """The last hex digits that a decimal fraction '3.14159...' fixes.
+    Returns the position of the first of them and the digits."""
+    fraction = digits.split('.', 1)[1]
+    places = len(fraction)
+
+    # 16^-hex_places is still above the 10^-places cut off
+    hex_places = math.floor(places * math.log(10) / math.log(16)) - HEX_GUARD
+    count = min(count, hex_places)
+
+    value = int_from_digits(fraction)
+    # only the bottom `count` hex digits are wanted
+    tail = ((value << (4 * hex_places)) // MPZ(10)**places) % (MPZ(16)**count)
+
+    return hex_places - count + 1, format(tail, 'X').zfill(count)
+
+def check_tail(digits : str, count : int, workers : int = 1) -> TailCheck :
+    position, converted = decimal_to_hex_tail(digits, count)
+    extracted = hex_range(position, len(converted), workers)
+    return TailCheck(position, converted, extracted)
@@ -0,0 +1,113 @@
+#
+# Binary splitting for the Chudnovsky series.
+#
+# Rather than adding one full precision term at a time, the terms
+# in the range [a, b) are folded together into three exact integers
+#   P(a,b), Q(a,b), T(a,b)
+# by recursively splitting the range in half and combining the halves.
+# Only at the very end is a single full precision division
+# (and one square root) needed.
+#
+# https://en.wikipedia.org/wiki/Chudnovsky_algorithm
+#
+import contextlib
+from multiprocessing import Pool
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from mpmath.libmp import MPZ
+
+from lib.newton import inv_sqrt, reciprocal
+
+# MPZ is the gmpy integer type if it is installed, python int otherwise.
+C3_OVER_24 = MPZ(640320)**3 // 24
+A = MPZ(13591409)
+B = MPZ(545140134)
+
+PQT = Tuple[int, int, int]
+
+# Called with each P, Q, T as it is merged, while set by watch
+# (lib/series calls it with its P, Q, B, T too)
+on_combine : Optional[Callable[..., None]] = None
+
+@contextlib.contextmanager
+def watch(callback : Optional[Callable[..., None]]) -> Iterator[None] :
+    """Hand every merged P, Q, T to callback (such as Instrument.record).
+    The last one merged is the P, Q, T of the whole range."""
+    global on_combine
+    on_combine = callback
+    try :
+        yield
+    finally :
+        on_combine = None
+
+def chudnovsky_split(a : int, b : int) -> PQT :
+    """Compute P, Q and T for the terms in [a, b)"""
+    if b - a == 1 :
+        if a == 0 :
+            p = q = MPZ(1)
+        else :
+            p = MPZ(6*a - 5) * (2*a - 1) * (6*a - 1)
+            q = MPZ(a)**3 * C3_OVER_24
+
+        t = p * (A + B * a)
+        if a & 1 :
+            t = -t
+
+        return p, q, t
+
+    m = (a + b) // 2
+
+    left = chudnovsky_split(a, m)
+    right = chudnovsky_split(m, b)
+
+    return combine(left, right)
+
+def combine(left : PQT, right : PQT) -> PQT :
+    """Merge the P, Q, T of two adjacent ranges [a, m) and [m, b)"""
+    p_am, q_am, t_am = left
+    p_mb, q_mb, t_mb = right
+
+    p, q, t = p_am * p_mb, q_am * q_mb, q_mb * t_am + p_am * t_mb
+    if on_combine is not None :
+        on_combine(p, q, t)
+
+    return p, q, t
+
+def _call(job : Tuple[Callable, Tuple]) :
+    func, args = job
+    return func(*args)
+
+def parallel_split(split : Callable, merge : Callable, a : int, b : int,
+                   workers : int, pool = None, args : Tuple = ()) :
+    """split(*args, lo, hi) for pieces of [a, b) in a pool of worker
+    processes, merged here with merge(left, right).
+    Anything with Pool's map (such as a cluster Coordinator) can be
+    given as the pool."""
+
+    # Later terms are bigger and so cost more. Cut the range into more
+    # pieces than there are workers so that no one worker is stuck with
+    # all the expensive terms.
+    pieces = min(b - a, workers * 4)
+    bounds = [a + (b - a) * i // pieces for i in range(pieces + 1)]
+    jobs = [(split, args + (lo, hi)) for lo, hi in zip(bounds, bounds[1:])]
+
+    with Pool(workers) if pool is None else contextlib.nullcontext(pool) as pool :
+        parts : List = pool.map(_call, jobs)
+
+    # Merge neighbours pairwise so the multiplies stay balanced
+    while len(parts) > 1 :
+        merged = [merge(parts[i], parts[i+1]) for i in range(0, len(parts) - 1, 2)]
+        if len(parts) % 2 == 1 :
+            merged.append(parts[-1])
+        parts = merged
+
+    return parts[0]
+
+def chudnovsky_split_parallel(a : int, b : int, workers : int, pool = None) -> PQT :
+    """Compute P, Q and T for [a, b) with parallel_split"""
+    return parallel_split(chudnovsky_split, combine, a, b, workers, pool)
+
+def chudnovsky_pi(q : int, t : int) :
+    """The one full precision step: pi = 426880 * sqrt(10005) * Q / T
+    = 426880 * 10005 * Q / (sqrt(10005) * T)"""
+    return inv_sqrt(10005) * (426880 * 10005 * q) * reciprocal(t)
@@ -0,0 +1,279 @@
+#
+# A cache of finished results shared by every calculator.
+#
+# The same digit targets get computed over and over while trying the
+# calculators out. With --cache DIR (or $COMPUTE_PI_CACHE) a run that
+# asks for --digits N is answered from any cached result with at least
+# N verified digits, whatever calculator made it.
+#
+# Results are stored under the sha256 of their digits, so the same
+# answer from two calculators is kept once. A small JSON index holds
+# how many places each has and how many of them are verified -
+# checked against the bundled million digits, and past their end
+# (with a warning) taken on the --digits guarantee of the run that
+# made them.
+#
+# Calculators that can checkpoint also leave their last checkpoint,
+# whether the run finished or was stopped. A later run that misses the
+# results is started from the closest one - the same calculator and
+# settings, at least the precision needed and the most iterations up
+# to the ones wanted.
+#
+# The index is only read and written under an exclusive flock, objects
+# are written to the side and renamed into place, and an object is
+# opened before the lock is let go, so any number of processes can
+# share a cache. Once the objects add up to more than --cache-size the
+# least recently used go first.
+#
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, TextIO, Tuple
+
+from mpmath import mp, mpf
+
+from lib import backends
+from lib.checkpoint import ResumableCalc
+from lib.common import BaseCalc
+from lib.formatter import write_plain
+from lib.radix import digit_chunks, int_from_digits
+from lib.verify import verify_files
+
+CACHE_VARIABLE = 'COMPUTE_PI_CACHE'
+
+CACHE_MB = 1024
+
+# Digits read past the ones asked for, so the value built from them
+# does not round down into the last digit
+EXTRA_PLACES = 10
+
+# The bundled million digits. Places past its end cannot be checked.
+REFERENCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         'pi-digits-formatted.txt')
+
+def _file_mode() -> int :
+    # mkstemp makes its files 0600 - objects get what open() would give them
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+FILE_MODE = _file_mode()
+
+# Settings that change what a calculator's saved state means
+STATE_SETTINGS = ('formula', 'fixed', 'shrink', 'layers')
+
+def add_cache_args(parser : argparse.ArgumentParser) -> None :
+    parser.add_argument('--cache', metavar='DIR', default=os.environ.get(CACHE_VARIABLE),
+                        help=f"Serve --digits runs from (and add them to) the result cache in DIR (default ${CACHE_VARIABLE})")
+    parser.add_argument('--cache-size', type=int, default=CACHE_MB, metavar='MB',
+                        help="Evict the least recently used results past this size")
+
+def state_config(calc : BaseCalc) -> str :
+    """What a checkpoint has to match to seed this calculator"""
+    settings = [calc.name, backends.current.name]
+    for key in STATE_SETTINGS :
+        value = getattr(calc, key, None)
+        settings.append(f"{key}={getattr(value, 'name', value)}")
+    return ' '.join(settings)
+
+class ResultCache :
+    def __init__(self, directory : str, limit : int = CACHE_MB << 20) -> None:
+        self.directory = directory
+        self.limit = limit
+        self.objects = os.path.join(directory, 'objects')
+        self.index_path = os.path.join(directory, 'index.json')
+        os.makedirs(self.objects, exist_ok=True)
+
+    @contextmanager
+    def _locked(self) -> Iterator[Dict[str, Dict[str, Any]]] :
+        """The index, written back when the block is done"""
+        with open(os.path.join(self.directory, 'index.lock'), 'w') as lock :
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+            index : Dict[str, Dict[str, Any]] = {}
+            if os.path.exists(self.index_path) :
+                with open(self.index_path) as f :
+                    index = json.load(f)
+
+            yield index
+
+            tmp = self.index_path + '.tmp'
+            with open(tmp, 'w') as f :
+                json.dump(index, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.index_path)
+
+    def _object(self, key : str) -> str :
+        return os.path.join(self.objects, key)
+
+    def _add(self, path : str, suffix : str, entry : Dict[str, Any]) -> str :
+        """Move the file at path into the cache under its hash"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f :
+            for block in iter(lambda : f.read(1 << 20), b'') :
+                digest.update(block)
+        key = digest.hexdigest() + suffix
+
+        entry.update(size=os.path.getsize(path), used=time.time())
+        with self._locked() as index :
+            os.replace(path, self._object(key))
+            os.chmod(self._object(key), FILE_MODE)
+            if key in index :
+                entry['made_by'] = sorted(set(index[key].get('made_by', []) + entry.get('made_by', [])))
+            index[key] = entry
+            self._evict(index, keep=key)
+
+        return key
+
+    def _evict(self, index : Dict[str, Dict[str, Any]], keep : str) -> None :
+        total = sum(e['size'] for e in index.values())
+        for key in sorted(index, key=lambda k : index[k]['used']) :
+            if total <= self.limit :
+                break
+            if key == keep :
+                continue
+            total -= index[key]['size']
+            del index[key]
+            try :
+                os.remove(self._object(key))
+            except FileNotFoundError :
+                pass
+
+    def work_file(self, suffix : str) -> str :
+        """A new file in the cache directory, to be added later"""
+        fd, path = tempfile.mkstemp(suffix=suffix, prefix='work-', dir=self.directory)
+        os.close(fd)
+        return path
+
+    #--------------------------------------------
+    # Results
+
+    def lookup(self, places : int) -> Optional[Tuple[TextIO, int]] :
+        """An open result with at least `places` verified places (the
+        shortest such) and its verified count, or None"""
+        with self._locked() as index :
+            found = [(e['verified'], key) for key, e in index.items()
+                     if e['kind'] == 'result' and e['verified'] >= places]
+            if not found :
+                return None
+            verified, key = min(found)
+            index[key]['used'] = time.time()
+            # open now - once the lock is gone it could be evicted
+            return open(self._object(key)), verified
+
+    def store(self, value, places : int, made_by : str,
+              reference : Optional[str] = REFERENCE) -> int :
+        """Add a result good to `places` places. Returns the places verified."""
+        path = self.work_file('.txt')
+        with open(path, 'w') as f :
+            write_plain(digit_chunks(value, places), f)
+
+        verified = places
+        checked = 0
+        if reference is not None and os.path.exists(reference) :
+            result = verify_files(path, reference)
+            if result.mismatch is not None :
+                verified = result.correct
+            checked = result.correct
+        if checked < verified :
+            print(f"warning: only {checked} of the {places} places could be checked - "
+                  "the rest are taken on the run's --digits plan", file=sys.stderr)
+
+        self._add(path, '.txt', {'kind' : 'result', 'places' : places,
+                                 'verified' : verified, 'made_by' : [made_by]})
+        return verified
+
+    #--------------------------------------------
+    # Checkpoints
+
+    def closest_checkpoint(self, config : str, iterations : int, dps : int, to : str) -> Optional[int] :
+        """Copy the checkpoint with the most iterations up to `iterations`,
+        made at `dps` or more, to the file `to`. Returns its iterations."""
+        with self._locked() as index :
+            found = [(e['iterations'], key) for key, e in index.items()
+                     if e['kind'] == 'checkpoint' and e['config'] == config
+                     and e['dps'] >= dps and 0 < e['iterations'] <= iterations]
+            if not found :
+                return None
+            done, key = max(found)
+            index[key]['used'] = time.time()
+            shutil.copyfile(self._object(key), to)
+            return done
+
+    def store_checkpoint(self, path : str, config : str) -> None :
+        with open(path, 'rb') as f :
+            saved = pickle.load(f)
+        iterations = saved['state']['next_k'] - saved['state']['start_k']
+        if iterations <= 0 :
+            os.remove(path)
+            return
+
+        self._add(path, '.ckpt', {'kind' : 'checkpoint', 'config' : config,
+                                  'iterations' : iterations, 'dps' : saved['dps']})
+
+def read_value(f : TextIO, places : int) :
+    """The first `places` places of a cached digit string as an mpf"""
+    with f :
+        text = f.read(places + EXTRA_PLACES + 64)
+    whole, fraction = text.split('.', 1)
+    fraction = fraction.strip()[:places + EXTRA_PLACES]
+
+    # half way to the next place, so it cannot round down into the one before
+    return mpf(2 * int_from_digits(whole + fraction) + 1) / (2 * mpf(10)**len(fraction))
+
+class CachedCalc(BaseCalc) :
+    """Put first in the bases so a cached answer skips everything else"""
+    cache : Optional[str] = None
+    cache_size : int = CACHE_MB
+    digits : Optional[int] = None
+
+    def approx_pi(self) :
+        return self.cached(super().approx_pi)
+
+    def cached(self, compute : Callable) :
+        """The answer from the cache, or compute() and add it.
+        Calculators with their own approx_pi go through this."""
+        if self.cache is None or self.digits is None :
+            return compute()
+
+        cache = ResultCache(self.cache, self.cache_size << 20)
+
+        hit = cache.lookup(self.digits)
+        if hit is not None :
+            f, verified = hit
+            print(f"{self.digits} digits served from the cache in {self.cache} ({verified} verified)",
+                  file=sys.stderr)
+            return read_value(f, self.digits)
+
+        work = None
+        if isinstance(self, ResumableCalc) and self.checkpoint is None :
+            work = cache.work_file('.ckpt')
+            config = state_config(self)
+            seed = cache.closest_checkpoint(config, self.iterations, mp.dps, work)
+            if seed is None :
+                os.remove(work)
+            else :
+                print(f"starting from a cached checkpoint at iteration {seed}", file=sys.stderr)
+                self.extend_to = self.iterations
+            self.checkpoint = work
+
+        try :
+            value = compute()
+        finally :
+            # left by the checkpoint loop - kept even if the run was stopped,
+            # so running it again starts from there
+            if work is not None and os.path.exists(work) :
+                cache.store_checkpoint(work, config)
+
+        verified = cache.store(value, self.digits, self.name)
+        print(f"{self.digits} digits added to the cache in {self.cache} ({verified} verified)",
+              file=sys.stderr)
+
+        return value
@@ -0,0 +1,139 @@
+#
+# Checkpoint, resume and extend for long runs.
+#
+# Every `checkpoint_every` iterations the calculator's state
+# (partial sums, powers, divisors, k, ...) is pickled to a file.
+# A crashed run can then pick up from the last checkpoint, and a
+# finished run can be continued to more iterations without starting
+# over from zero.
+#
+# The loop here is used whether or not there is a checkpoint file, so
+# it is also where the progress reports come from (lib/progress.py).
+#
+import argparse
+import os
+import pickle
+import sys
+from typing import Optional
+
+from mpmath import mp
+from mpmath.libmp import dps_to_prec
+
+from lib import backends
+from lib.common import BaseCalc
+from lib.progress import REPORT_SECONDS, Progress, add_progress_arg
+
+# Attributes that belong to this run, not the saved state
+RUN_ATTRIBUTES = ('iterations', 'progress_count', 'report_every', 'checkpoint', 'resume', 'extend_to')
+
+def add_checkpoint_args(parser : argparse.ArgumentParser) -> None :
+    parser.add_argument('--checkpoint', metavar='FILE', default=None,
+                        help="Save the calculator state to this file as the run goes")
+    parser.add_argument('--checkpoint-every', type=int, default=10000,
+                        help="Iterations between checkpoints")
+    parser.add_argument('--resume', action='store_true',
+                        help="Pick the run back up from the checkpoint file")
+    parser.add_argument('--extend-to', type=int, default=None, metavar='N',
+                        help="Continue the checkpointed run until it has done N iterations")
+    add_progress_arg(parser)
+
+def _state(calc : BaseCalc) -> dict :
+    # callables are hooks (such as timing wrappers), not state
+    return {key : value for key, value in vars(calc).items()
+            if key not in RUN_ATTRIBUTES and key != 'instrument' and not callable(value)}
+
+def _shape(value) :
+    """The kinds of object (and their attributes) in a piece of state,
+    None for plain numbers"""
+    if isinstance(value, (list, tuple)) :
+        shapes = [_shape(v) for v in value]
+        return shapes if any(s is not None for s in shapes) else None
+    if hasattr(value, '__dict__') :
+        return (type(value).__name__, sorted(vars(value)))
+    return None
+
+def save_state(calc : BaseCalc, path : str) -> None :
+    state = _state(calc)
+
+    # write to the side and rename so a crash mid-write
+    # never leaves us without a good checkpoint
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f :
+        pickle.dump({'name' : calc.name, 'dps' : mp.dps, 'backend' : backends.current.name,
+                     'extra_bits' : backends.current.extra_bits, 'state' : state},
+                    f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+def _read(path : str) :
+    with open(path, 'rb') as f :
+        return pickle.load(f)
+
+def saved_dps(path : str) -> int :
+    """The precision a checkpoint was made at"""
+    return _read(path)['dps']
+
+def load_state(calc : BaseCalc, path : str) -> None :
+    saved = _read(path)
+
+    if saved['name'] != calc.name :
+        raise ValueError(f"{path} is a checkpoint for {saved['name']}, not {calc.name}")
+
+    # the same name is not enough - the terms have to be the ones this
+    # calculator (and its settings, such as the formula) would make
+    for key, value in _state(calc).items() :
+        if key not in saved['state'] or _shape(saved['state'][key]) != _shape(value) :
+            raise ValueError(f"{path} does not hold the state this {calc.name} run needs ({key} differs)")
+
+    if mp.dps > saved['dps'] :
+        print(f"warning: checkpoint was made at {saved['dps']} digits - "
+              "the result cannot be more precise than that", file=sys.stderr)
+    else :
+        mp.dps = saved['dps']
+
+    # the saved numbers only make sense in the arithmetic they were made in
+    backend = saved.get('backend', 'mpmath')
+    if backend != backends.current.name :
+        raise ValueError(f"{path} was made with --backend {backend}, not {backends.current.name}")
+    # a fixed point scale has to be the one the numbers were saved at
+    backends.current.extra_bits = saved.get('extra_bits', 0)
+    backends.current.set_precision(dps_to_prec(saved['dps']))
+
+    vars(calc).update(saved['state'])
+
+
+class ResumableCalc(BaseCalc) :
+    checkpoint : Optional[str] = None
+    checkpoint_every : int = 10000
+    resume : bool = False
+    extend_to : Optional[int] = None
+    report_every : float = REPORT_SECONDS
+
+    def __init__(self, first_iter : int = 1) -> None:
+        super().__init__(first_iter=first_iter)
+
+        # index of the first term added by the loop and of the next one to add
+        self.start_k : int = first_iter
+        self.next_k : int = first_iter
+
+    def approx_pi(self) :
+        if self.checkpoint is not None and (self.resume or self.extend_to is not None) :
+            load_state(self, self.checkpoint)
+            print(f"resuming at iteration {self.next_k - self.start_k}", file=sys.stderr)
+
+        iterations = self.extend_to or self.iterations
+        last_k = self.start_k + iterations
+
+        with Progress(iterations, self.report_every, self.next_k - self.start_k) as progress :
+            while self.next_k < last_k :
+                self.k = self.next_k
+                self.add_term()
+                self.next_k += 1
+                progress.count = self.next_k - self.start_k
+
+                if self.checkpoint is not None and self.next_k % self.checkpoint_every == 0 :
+                    save_state(self, self.checkpoint)
+
+        if self.checkpoint is not None :
+            save_state(self, self.checkpoint)
+
+        return self.final_compute()
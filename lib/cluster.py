@@ -0,0 +1,252 @@
+#
+# Spread work units over worker processes on other machines.
+#
+# multiprocessing.Pool only reaches the cpus of one host. Here the
+# calculator is the coordinator: it listens on a TCP port and any
+# number of workers (cluster-worker.py, on any host with a copy of
+# this repository) connect to it and are handed work units, one at a
+# time, until there are none left.
+#
+# A unit is a function from lib and its arguments - such as a range of
+# terms to fold together by binary splitting - and the reply is what
+# the function returns. multiprocessing.connection does the framing,
+# the pickling and a challenge/response on a shared key, so only
+# workers that know the key are let in.
+#
+# The coordinator has a map() like Pool's, so the code that cuts the
+# work up and merges the pieces is the same either way.
+#
+# A unit whose worker goes away (or takes longer than the timeout) is
+# put back on the queue for another worker, up to `retries` times.
+# An exception raised by the unit itself is not retried - it would
+# only happen again.
+#
+import argparse
+import contextlib
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+from multiprocessing import Process
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+# The shared key comes from here, so it is never on a command line
+AUTHKEY_VARIABLE = 'COMPUTE_PI_AUTHKEY'
+
+Address = Tuple[str, int]
+
+class ClusterError(RuntimeError) :
+    pass
+
+def parse_address(text : str) -> Address :
+    host, _, port = text.rpartition(':')
+    return host or 'localhost', int(port)
+
+def authkey(required : bool = True) -> Optional[bytes] :
+    key = os.environ.get(AUTHKEY_VARIABLE)
+    if key is None :
+        if required :
+            raise ClusterError(f"set {AUTHKEY_VARIABLE} to the key the workers share")
+        return None
+    return key.encode()
+
+class _Job :
+    """One map() call"""
+    def __init__(self, func : Callable, args : List[Any], retries : int) -> None:
+        self.func = func
+        self.args = args
+        self.retries = retries
+        self.results : List[Any] = [None] * len(args)
+        self.attempts : List[int] = [0] * len(args)
+        self.left = len(args)
+        self.error : Optional[str] = None
+        self.done = threading.Event()
+
+class Coordinator :
+    """Hand out units to the workers that connect to `address`"""
+    def __init__(self, address : Address, key : bytes,
+                 timeout : Optional[float] = None, retries : int = 3) -> None:
+        self.address = address
+        self.key = key
+        self.timeout = timeout
+        self.retries = retries
+
+        self.units : 'queue.Queue[Tuple[_Job, int]]' = queue.Queue()
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        self.workers : int = 0
+        self.listener : Optional[Listener] = None
+
+    def __enter__(self) -> 'Coordinator' :
+        self.listener = Listener(self.address, authkey=self.key)
+        # port 0 picks a free port
+        self.address = self.listener.address
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None :
+        self.stopping.set()
+        if self.listener is not None :
+            self.listener.close()
+
+    def _accept(self) -> None :
+        while not self.stopping.is_set() :
+            try :
+                conn = self.listener.accept()
+            except Exception as e :
+                if self.stopping.is_set() :
+                    return
+                # most likely a connection with the wrong key
+                print(f"connection refused ({e!r})", file=sys.stderr)
+                continue
+            with self.lock :
+                self.workers += 1
+                worker = self.workers
+            print(f"worker {worker} connected", file=sys.stderr)
+            threading.Thread(target=self._serve, args=(conn, worker), daemon=True).start()
+
+    def _serve(self, conn : Connection, worker : int) -> None :
+        with conn :
+            while True :
+                try :
+                    job, index = self.units.get(timeout=0.2)
+                except queue.Empty :
+                    if self.stopping.is_set() :
+                        with contextlib.suppress(OSError) :
+                            conn.send(('stop',))
+                        return
+                    continue
+
+                if job.done.is_set() :
+                    continue
+
+                try :
+                    conn.send(('unit', job.func, job.args[index]))
+                    if not conn.poll(self.timeout) :
+                        raise TimeoutError(f"no reply in {self.timeout} seconds")
+                    reply = conn.recv()
+                except (OSError, EOFError, TimeoutError) as e :
+                    print(f"worker {worker} lost ({e!r}) - unit {index} goes back on the queue",
+                          file=sys.stderr)
+                    self._retry(job, index)
+                    return
+
+                if reply[0] == 'result' :
+                    self._finish(job, index, reply[1])
+                else :
+                    job.error = f"unit {index} failed on worker {worker}:\n{reply[1]}"
+                    job.done.set()
+
+    def _retry(self, job : _Job, index : int) -> None :
+        with self.lock :
+            job.attempts[index] += 1
+            if job.attempts[index] > job.retries :
+                job.error = f"unit {index} failed {job.attempts[index]} times"
+                job.done.set()
+                return
+        self.units.put((job, index))
+
+    def _finish(self, job : _Job, index : int, result : Any) -> None :
+        with self.lock :
+            job.results[index] = result
+            job.left -= 1
+            if job.left == 0 :
+                job.done.set()
+
+    def map(self, func : Callable, iterable : Iterable, chunksize : Optional[int] = None) -> List[Any] :
+        """[func(x) for x in iterable], worked out by the workers"""
+        job = _Job(func, [(x,) for x in iterable], self.retries)
+        if not job.args :
+            return []
+
+        for index in range(len(job.args)) :
+            self.units.put((job, index))
+
+        job.done.wait()
+        if job.error is not None :
+            raise ClusterError(job.error)
+        return job.results
+
+def run_worker(address : Address, key : bytes, wait : float = 60.0) -> int :
+    """Do units for the coordinator at address until it has no more.
+    Returns the number of units done."""
+    deadline = time.monotonic() + wait
+    while True :
+        try :
+            conn = Client(address, authkey=key)
+            break
+        except ConnectionRefusedError :
+            # the coordinator is not up yet
+            if time.monotonic() > deadline :
+                raise
+            time.sleep(0.5)
+
+    done = 0
+    with conn :
+        while True :
+            try :
+                message = conn.recv()
+            except EOFError :
+                break
+            except Exception :
+                # the unit could not be unpickled here
+                conn.send(('error', traceback.format_exc()))
+                continue
+
+            if message[0] == 'stop' :
+                break
+
+            _, func, args = message
+            try :
+                result = func(*args)
+            except Exception :
+                conn.send(('error', traceback.format_exc()))
+                continue
+
+            conn.send(('result', result))
+            done += 1
+
+    return done
+
+def start_local_workers(address : Address, key : bytes, count : int) -> List[Process] :
+    """Worker processes on this host - to try the whole thing out on one box"""
+    workers = [Process(target=run_worker, args=(address, key), daemon=True) for _ in range(count)]
+    for w in workers :
+        w.start()
+    return workers
+
+#--------------------------------------------
+# Calculator side
+
+def add_cluster_args(parser : argparse.ArgumentParser) -> None :
+    parser.add_argument('--listen', metavar='HOST:PORT', default=None,
+                        help="Hand the work out to cluster-worker.py processes that connect here "
+                             f"(they share the key in ${AUTHKEY_VARIABLE})")
+    parser.add_argument('--local-workers', type=int, default=0, metavar='N',
+                        help="With --listen, also start N workers on this host")
+    parser.add_argument('--unit-timeout', type=float, default=None, metavar='SECONDS',
+                        help="With --listen, give a unit to another worker if there is no answer in this time")
+
+@contextlib.contextmanager
+def cluster(calc) :
+    """A Coordinator for the run if it was given --listen, None if not"""
+    listen = getattr(calc, 'listen', None)
+    if listen is None :
+        yield None
+        return
+
+    local = getattr(calc, 'local_workers', 0)
+    # a run that is all on this host can make up its own key
+    key = authkey(required=local == 0) or os.urandom(32)
+
+    with Coordinator(parse_address(listen), key, getattr(calc, 'unit_timeout', None)) as coordinator :
+        print(f"coordinator listening on {coordinator.address[0]}:{coordinator.address[1]}",
+              file=sys.stderr)
+        workers = start_local_workers(coordinator.address, key, local)
+        yield coordinator
+
+    for w in workers :
+        w.join(timeout=5)
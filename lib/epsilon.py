@@ -0,0 +1,115 @@
+#
+# Wynn's epsilon algorithm.
+#
+# Builds the table
+#
+#   e(-1, n) = 0
+#   e(0, n)  = S(n)                   the partial sums
+#   e(k+1, n) = e(k-1, n+1) + 1 / (e(k, n+1) - e(k, n))
+#
+# The even columns e(2l, n) are Shanks' transform of order l of the
+# partial sums. Each new partial sum adds one anti-diagonal to the
+# table, and that only needs the anti-diagonal before it - so that
+# is all that is kept, and it is updated in place with one pass of
+# 2 * layers steps.
+#
+# The estimate usually has far more right digits than the partial sums,
+# so the digits printed are sized from how far the estimate still moved
+# with the last partial sum rather than from the plain series.
+#
+from typing import Any, List
+
+from mpmath import log10, mp, mpf
+
+from lib.common import BaseCalc
+from lib.options import per_iteration
+from lib.planning import PLAN_GUARD_DIGITS
+from lib.precision import guard_digits
+
+class WynnEpsilon :
+    def __init__(self, layers : int) -> None:
+        self.layers = layers
+        # diagonal[j] = e(j, n - j) for the latest partial sum S(n)
+        self.diagonal : List[Any] = []
+        # the estimate before the latest value was added
+        self.previous : Any = None
+
+    def add(self, value) -> None :
+        diagonal = self.diagonal
+        self.previous = self.estimate() if diagonal else None
+        depth = min(len(diagonal) + 1, 2 * self.layers + 1)
+
+        # e(j-2, n-j+2) and e(j-1, n-j+1) from the old diagonal
+        before = mpf(0)
+        new = value
+        for j in range(1, depth) :
+            old = diagonal[j - 1]
+            diagonal[j - 1] = new
+            delta = new - old
+            if delta == 0 :
+                # this column has converged, there is nothing deeper
+                del diagonal[j:]
+                return
+            new = before + 1 / delta
+            before = old
+
+        if depth > len(diagonal) :
+            diagonal.append(new)
+        else :
+            diagonal[depth - 1] = new
+
+    def estimate(self) :
+        """The deepest even column so far"""
+        if not self.diagonal :
+            return mpf(0)
+        deepest = (len(self.diagonal) - 1) // 2 * 2
+        return self.diagonal[deepest]
+
+    def error(self) :
+        """How far the estimate moved with the latest value - taken as
+        how far off it still is. None before there are two values."""
+        if self.previous is None :
+            return None
+        return abs(self.estimate() - self.previous)
+
+class EpsilonCalc(BaseCalc) :
+    """Accelerate a calculator's partial results with Wynn's epsilon.
+
+    With layers > 0 the value of final_compute after each add_term is fed
+    to the table, and the answer is the table's deepest estimate. That
+    needs every partial result in turn, so the run is serial. The
+    digits printed are sized from the table's error estimate.
+
+    List it first among the bases so that anything else wrapping
+    add_term or final_compute (such as StagedCalc) sees the accelerated
+    sequence."""
+    layers : int = 0
+
+    def approx_pi(self) :
+        if self.layers <= 0 :
+            return super().approx_pi()
+
+        self.workers = 1
+
+        table = WynnEpsilon(self.layers)
+        add_term = self.add_term
+        partial = type(self).final_compute
+
+        def accelerated_add_term() :
+            add_term()
+            table.add(partial(self))
+
+        self.add_term = accelerated_add_term
+        self.final_compute = table.estimate
+
+        table.add(partial(self))
+        pi = super().approx_pi()
+
+        # driver prints iterations * digits_per_iter digits
+        digits = mp.dps - guard_digits(self.iterations)
+        error = table.error()
+        if error is not None and error > 0 :
+            digits = min(digits, int(-log10(error)) - PLAN_GUARD_DIGITS)
+        type(self).digits_per_iter = per_iteration(max(digits, 1), self.iterations)
+
+        return pi
@@ -0,0 +1,57 @@
+#
+# Fixed point arctan(1/b) for the Machin-like formulas.
+#
+# Every value is one big integer that stands for value * 10**scale.
+# Each new term is then just two integer divisions (by b**2 and by
+# the odd divisor) - no float normalisation or rounding to pay for.
+#
+from mpmath import mpf
+from mpmath.libmp import MPZ
+
+# Each term truncates by less than one unit in the last place, so
+# the guard digits soak up the error of up to 10**guard terms.
+GUARD_DIGITS = 10
+
+class FixedMachinTerm :
+    def __init__(self, factor : int, base : int, digits : int, guard : int = GUARD_DIGITS) -> None:
+        self.factor = factor
+        self.base = base
+        self.scale = digits + guard
+
+        # 1/b
+        self.power = MPZ(10)**self.scale // base
+        self.partial = self.power
+
+        self.base_squared = MPZ(base)**2
+        self.k : int = 0
+        self.divisor : int = 1
+
+    def compute_term(self) :
+        self.k += 1
+        self.divisor += 2
+
+        self.power //= self.base_squared
+
+        if self.k & 1 :
+            self.partial -= self.power // self.divisor
+        else :
+            self.partial += self.power // self.divisor
+
+def fixed_arctan_range(base : int, a : int, b : int, scale : int) -> int :
+    """The terms [a, b) of arctan(1/base) as a fixed point integer"""
+    base_squared = MPZ(base)**2
+    power = MPZ(10)**scale // MPZ(base)**(2*a + 1)
+    partial = MPZ(0)
+
+    for k in range(a, b) :
+        if k & 1 :
+            partial -= power // (2*k + 1)
+        else :
+            partial += power // (2*k + 1)
+        power //= base_squared
+
+    return partial
+
+def fixed_to_mpf(value : int, scale : int) :
+    """Turn a fixed point integer back into an mpf at the current precision"""
+    return mpf(value) / (MPZ(10)**scale)
@@ -0,0 +1,112 @@
+#
+# Streaming digit formatter.
+#
+# Split digits into groups of 10 and then print 10 such groups on
+# a line prefixed with a group counter :
+#
+#      0|3.1415926535 8979323846 ...
+#     10|  8214808651 3282306647 ...
+#
+# The digits come in as a series of chunks (strings) of any size and
+# go out in large buffered writes, so memory use does not depend on
+# the number of digits.
+#
+import sys
+from typing import Iterable, Iterator, List, Optional, TextIO
+
+# number of digits per group
+DIGITS_PER_GROUP : int = 10
+# number of groups per line
+GROUPS_PER_LINE : int = 10
+
+DIGITS_PER_LINE : int = DIGITS_PER_GROUP * GROUPS_PER_LINE
+
+# lines to collect before each write
+LINES_PER_WRITE : int = 1000
+
+# size of each read when streaming from a file
+READ_SIZE : int = 1 << 20
+
+def _format_line(n : int, lead : str, digits : str) -> str :
+    groups = [digits[start:start+DIGITS_PER_GROUP]
+              for start in range(0, len(digits), DIGITS_PER_GROUP)]
+    return f"{n:6}|" + lead + " ".join(groups) + "\n"
+
+def write_formatted(chunks : Iterable[str], out : Optional[TextIO] = None,
+                    lines_per_write : int = LINES_PER_WRITE) -> None :
+    """Write a number like '3.14159...' in the grouped layout.
+    Each write is flushed, so with a small lines_per_write the lines
+    show up as soon as their digits arrive."""
+    out = out or sys.stdout
+
+    leading : Optional[str] = None
+    prefix : str = ''
+    pending : str = ''
+    n : int = 0
+    lines : List[str] = []
+
+    for chunk in chunks :
+        pending += chunk
+
+        if leading is None :
+            if '.' not in pending :
+                continue
+            leading, pending = pending.split('.', 1)
+            prefix = ' ' * (len(leading)+1)
+
+        start = 0
+        while len(pending) - start >= DIGITS_PER_LINE :
+            lead = leading + '.' if n == 0 else prefix
+            lines.append(_format_line(n, lead, pending[start:start+DIGITS_PER_LINE]))
+            start += DIGITS_PER_LINE
+            n += GROUPS_PER_LINE
+
+        pending = pending[start:]
+
+        if len(lines) >= lines_per_write :
+            out.write(''.join(lines))
+            out.flush()
+            lines = []
+
+    if leading is None :
+        leading, pending = pending, ''
+
+    if pending or n == 0 :
+        lead = leading + '.' if n == 0 else prefix
+        lines.append(_format_line(n, lead, pending))
+
+    out.write(''.join(lines))
+    out.flush()
+
+def unformat(lines : Iterable[str]) -> Iterator[str] :
+    """Turn the grouped layout back into chunks of a plain digit string"""
+    for line in lines :
+        if '|' in line :
+            yield ''.join(line.split('|', 1)[1].split())
+
+def write_plain(chunks : Iterable[str], out : Optional[TextIO] = None,
+                block_size : int = READ_SIZE) -> None :
+    """Write the chunks as one long digit string, block_size digits or more per write"""
+    out = out or sys.stdout
+
+    block : List[str] = []
+    size : int = 0
+    for chunk in chunks :
+        block.append(chunk)
+        size += len(chunk)
+        if size >= block_size :
+            out.write(''.join(block))
+            out.flush()
+            block = []
+            size = 0
+
+    out.write(''.join(block))
+    out.flush()
+
+def read_chunks(f : TextIO) -> Iterator[str] :
+    """Read a plain digit string in blocks, dropping any whitespace"""
+    while True :
+        block = f.read(READ_SIZE)
+        if not block :
+            return
+        yield ''.join(block.split())
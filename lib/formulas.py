@@ -0,0 +1,95 @@
+#
+# Machin-like formulas
+#
+#   pi / 4 = sum( factor * arctan(1/base) )
+#
+# and a cost model to choose between them.
+#
+# Cost model:
+#   arctan(1/b) gains 2*log10(b) digits a term, so D digits need about
+#   D / (2*log10(b)) terms of it. Summed over the formula that is
+#   D/2 times the Lehmer measure, sum( 1/log10(b) ) - the fewer and the
+#   bigger the bases, the less work.
+#
+#   Every term is a division by b**2 and by the odd divisor. While b**2
+#   fits in a machine word both are single pass divisions, bigger bases
+#   cost a pass per word.
+#
+#   With several workers the work either splits evenly (each worker
+#   takes a slice of the terms of every arctan), or each arctan is a
+#   job of its own and the slowest worker sets the time. Then a formula
+#   with one expensive arctan can lose to one with more, cheaper ones.
+#
+import math
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+Params = NamedTuple('Params', factor=int, base=int)
+
+Formula = NamedTuple('Formula', name=str, terms=List[Params], origin=str)
+
+WORD_BITS = 64
+
+FORMULAS : Dict[str, Formula] = {f.name : f for f in [
+    Formula('euler', [Params(1, 2), Params(1, 3)], 'Euler 1737'),
+    Formula('hutton', [Params(2, 3), Params(1, 7)], 'Hutton 1776'),
+    Formula('machin', [Params(4, 5), Params(-1, 239)], 'Machin 1706'),
+    Formula('klingenstierna', [Params(8, 10), Params(-1, 239), Params(-4, 515)], 'Klingenstierna 1730'),
+    Formula('stormer-3', [Params(6, 8), Params(2, 57), Params(1, 239)], 'Störmer 1896'),
+    Formula('gauss', [Params(12, 18), Params(8, 57), Params(-5, 239)], 'Gauss 1863'),
+    # used in 2002 to set a world record on the number of digits
+    Formula('takano', [Params(12, 49), Params(32, 57), Params(-5, 239), Params(12, 110443)],
+            'Takano 1982'),
+    Formula('stormer', [Params(44, 57), Params(7, 239), Params(-12, 682), Params(24, 12943)],
+            'Störmer 1896'),
+    Formula('hwang-1997', [Params(183, 239), Params(32, 1023), Params(-68, 5832),
+                           Params(12, 110443), Params(-12, 4841182), Params(-100, 6826318)],
+            'Hwang Chien-Lih 1997'),
+]}
+
+def lehmer_measure(terms : Sequence[Params]) -> float :
+    return sum(1 / math.log10(p.base) for p in terms)
+
+def digits_per_term(formula : Formula) -> float :
+    """Digits each round of terms adds - set by the smallest base"""
+    return 2 * math.log10(min(p.base for p in formula.terms))
+
+def terms_needed(factor : int, base : int, digits : int) -> int :
+    """Terms of factor * 4 * arctan(1/base) to get it to 10**-digits.
+    The tail is below the next term 4 * factor / base**(2n+1)"""
+    return math.ceil((digits + math.log10(4 * abs(factor))) / (2 * math.log10(base)))
+
+def term_cost(base : int) -> int :
+    """Passes over the number for one term"""
+    return max(1, math.ceil((base * base).bit_length() / WORD_BITS))
+
+def arctan_costs(formula : Formula, digits : int) -> List[int] :
+    return [terms_needed(p.factor, p.base, digits) * term_cost(p.base)
+            for p in formula.terms]
+
+def makespan(loads : Sequence[float], workers : int) -> float :
+    """Longest worker when each load is a job of its own, handed
+    out biggest first to the least busy worker"""
+    busy = [0.0] * max(1, workers)
+    for load in sorted(loads, reverse=True) :
+        busy[busy.index(min(busy))] += load
+    return max(busy)
+
+def cost(formula : Formula, digits : int, workers : int = 1, arctan_per_worker : bool = False) -> float :
+    """Term-divisions on the slowest worker for D digits"""
+    loads = arctan_costs(formula, digits)
+    if arctan_per_worker :
+        return makespan(loads, workers)
+    return sum(loads) / max(1, workers)
+
+def cheapest(digits : int, workers : int = 1, arctan_per_worker : bool = False) -> Formula :
+    return min(FORMULAS.values(),
+               key=lambda f : cost(f, digits, workers, arctan_per_worker))
+
+def find_formula(name : str, digits : Optional[int] = None, workers : int = 1,
+                 arctan_per_worker : bool = False) -> Formula :
+    """Look a formula up by name. 'auto' picks the cheapest for the digits and workers"""
+    if name == 'auto' :
+        if digits is None :
+            raise ValueError("picking a formula needs a digit target")
+        return cheapest(digits, workers, arctan_per_worker)
+    return FORMULAS[name]
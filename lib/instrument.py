@@ -0,0 +1,182 @@
+#
+# Where does a run spend its time?
+#
+# An Instrument records :
+#   - each phase of a run (series terms, final division, verify, ...)
+#     with its time, the peak memory so far and the size of the numbers
+#     the calculator is holding at the end of it
+#     (its attributes, plus any numbers handed to record - the
+#     binary splitting code keeps P, Q and T in locals)
+#   - a histogram of add_term latency, sampled every few calls
+#
+# The results can be written as a JSON report, or as a trace file that
+# loads into a Chrome style trace viewer (chrome://tracing, Perfetto).
+#
+import contextlib
+import json
+import os
+import resource
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from mpmath import mpf
+
+# time one add_term call in this many
+SAMPLE_EVERY : int = 16
+
+def peak_rss_kb() -> int :
+    # kilobytes on linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def _bits(value : Any, seen : set) -> List[int] :
+    """Bit sizes of the big numbers held in value"""
+    if id(value) in seen :
+        return []
+    seen.add(id(value))
+
+    if isinstance(value, mpf) :
+        return [value.man_exp[0].bit_length()]
+    if isinstance(value, bool) :
+        return []
+    if isinstance(value, int) or type(value).__name__ == 'mpz' :
+        return [int(value).bit_length()]
+    if isinstance(value, (list, tuple)) :
+        return [b for v in value for b in _bits(v, seen)]
+    if hasattr(value, '__dict__') and not isinstance(value, type) :
+        return [b for v in vars(value).values() for b in _bits(v, seen)]
+    return []
+
+def operand_bits(calc : Any, held : Sequence[int] = ()) -> Dict[str, int] :
+    sizes = _bits(calc, set()) + list(held)
+    return {'count' : len(sizes), 'max' : max(sizes, default=0), 'total' : sum(sizes)}
+
+class Histogram :
+    """Counts of durations in power of 2 nanosecond buckets"""
+    def __init__(self) -> None:
+        self.buckets : Dict[int, int] = {}
+        self.count : int = 0
+        self.total : float = 0.0
+
+    def add(self, seconds : float) -> None :
+        bucket = max(int(seconds * 1e9), 1).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+
+    def as_dict(self) -> Dict[str, Any] :
+        return {
+            'samples' : self.count,
+            'mean_seconds' : self.total / self.count if self.count else 0.0,
+            'buckets' : {f"<{1 << b}ns" : n for b, n in sorted(self.buckets.items())},
+        }
+
+class Instrument :
+    def __init__(self, name : str) -> None:
+        self.name = name
+        self.origin = time.perf_counter()
+        self.phases : List[Dict[str, Any]] = []
+        self.add_term = Histogram()
+        self.calc : Optional[Any] = None
+        self.open : Dict[str, float] = {}
+        # bit sizes of the numbers last given to record
+        self.held : List[int] = []
+
+    def _now_us(self) -> float :
+        return (time.perf_counter() - self.origin) * 1e6
+
+    def record(self, *values : Any) -> None :
+        """The numbers the calculator now holds outside its attributes"""
+        self.held = [v.bit_length() for v in values]
+
+    def begin(self, name : str) -> None :
+        self.open[name] = self._now_us()
+
+    def end(self, name : str) -> None :
+        if name not in self.open :
+            return
+        start = self.open.pop(name)
+        self.phases.append({
+            'name' : name,
+            'start_us' : start,
+            'duration_us' : self._now_us() - start,
+            'peak_rss_kb' : peak_rss_kb(),
+            'operand_bits' : operand_bits(self.calc, self.held) if self.calc is not None else {},
+        })
+
+    @contextlib.contextmanager
+    def phase(self, name : str) -> Iterator[None] :
+        self.begin(name)
+        try :
+            yield
+        finally :
+            self.end(name)
+
+    def attach(self, calc : Any) -> None :
+        """Time a sample of the calculator's add_term calls and split
+        the run into the 'terms' (from the first add_term) and 'final'
+        phases"""
+        self.calc = calc
+        add_term = calc.add_term
+        final_compute = calc.final_compute
+        histogram = self.add_term
+        calls = 0
+
+        def timed_add_term() :
+            nonlocal calls
+            if calls == 0 :
+                self.begin('terms')
+            calls += 1
+            if calls % SAMPLE_EVERY :
+                return add_term()
+            start = time.perf_counter()
+            add_term()
+            histogram.add(time.perf_counter() - start)
+
+        def timed_final_compute() :
+            self.end('terms')
+            with self.phase('final') :
+                return final_compute()
+
+        calc.add_term = timed_add_term
+        calc.final_compute = timed_final_compute
+
+    def report(self) -> Dict[str, Any] :
+        phases = sorted(self.phases, key=lambda p : p['start_us'])
+        return {
+            'calculator' : self.name,
+            'phases' : [{
+                'name' : p['name'],
+                'seconds' : p['duration_us'] / 1e6,
+                'peak_rss_kb' : p['peak_rss_kb'],
+                'operand_bits' : p['operand_bits'],
+            } for p in phases],
+            'add_term' : self.add_term.as_dict(),
+        }
+
+    def write_report(self, path : str) -> None :
+        with open(path, 'w') as f :
+            json.dump(self.report(), f, indent=2)
+
+    def write_trace(self, path : str) -> None :
+        """Chrome trace event format"""
+        pid = os.getpid()
+        events : List[Dict[str, Any]] = [{
+            'name' : 'process_name', 'ph' : 'M', 'pid' : pid, 'tid' : 0,
+            'args' : {'name' : self.name},
+        }]
+
+        for p in self.phases :
+            events.append({
+                'name' : p['name'], 'cat' : 'phase', 'ph' : 'X',
+                'ts' : p['start_us'], 'dur' : p['duration_us'],
+                'pid' : pid, 'tid' : 0,
+                'args' : {'operand_bits' : p['operand_bits']},
+            })
+            events.append({
+                'name' : 'peak_rss_kb', 'ph' : 'C',
+                'ts' : p['start_us'] + p['duration_us'], 'pid' : pid, 'tid' : 0,
+                'args' : {'peak_rss_kb' : p['peak_rss_kb']},
+            })
+
+        with open(path, 'w') as f :
+            json.dump({'traceEvents' : events, 'displayTimeUnit' : 'ms'}, f)
@@ -0,0 +1,142 @@
+#
+# The parts shared by the Machin-like calculators.
+#
+# Each branch of a machin-like formula looks like a * arctan(1/b).
+# MachinTerm keeps the partial sum of one arctan as the run goes (on
+# the current backend), FixedMachinTerm (lib/fixedpoint.py) the same
+# in fixed point.
+#
+# MachinCalc sums a whole formula, one term of every arctan per
+# iteration, and can also sum any range of the terms (for --workers)
+# or hand the arctans to binary splitting (for --split).
+#
+from typing import Any, List, Optional, Tuple
+
+from mpmath import mp, mpf
+
+from lib.backends import BackendCalc, number, to_mpf
+from lib.checkpoint import ResumableCalc
+from lib.fixedpoint import FixedMachinTerm, fixed_arctan_range, fixed_to_mpf
+from lib.formulas import Formula, terms_needed
+from lib.planning import arctan_tail_digits
+from lib.precision import TermPrecision
+from lib.series import ArctanSeries, SplitCalc
+
+class MachinTerm :
+    def __init__(self, factor, argument, precision : Optional[TermPrecision] = None) -> None:
+        self.factor = factor
+        self.argument = argument
+
+        self.power = argument
+        self.partial = argument
+
+        self.arg_squared = argument**2
+        self.sign : int = 1
+        self.k : int = 0
+        self.divisor : int = 1
+        self.precision = precision
+
+    def compute_term(self) :
+        self.k += 1
+        self.sign *= -1
+        self.divisor += 2
+
+        if self.precision is not None :
+            self.power, new_term = self.precision.next_term(self.power, self.k, self.sign, self.divisor)
+        else :
+            self.power *= self.arg_squared
+            new_term = self.power * self.sign / self.divisor
+
+        self.partial += new_term
+
+def machin_terms(formula : Formula, fixed : bool, shrink : bool) -> Tuple[List[Any], List[int]] :
+    """A term for each arctan of the formula at the current precision,
+    and the number of terms each one needs"""
+    if fixed :
+        params : List[Any] = [FixedMachinTerm(p.factor, p.base, mp.dps)
+            for p in formula.terms]
+    else :
+        params = [MachinTerm(
+            factor = number(p.factor),
+            argument = number(1) / p.base,
+            precision = TermPrecision(p.base, mp.dps) if shrink else None,
+            ) for p in formula.terms]
+
+    # the arctans with bigger bases are done long before the smallest one
+    needed = [terms_needed(p.factor, p.base, mp.dps) for p in formula.terms]
+
+    return params, needed
+
+class MachinCalc(SplitCalc, ResumableCalc, BackendCalc) :
+    """A calculator for pi = 4 * formula. Subclasses give the formula."""
+    formula : Formula
+    fixed : bool = False
+    shrink : bool = False
+
+    @classmethod
+    def tail_digits(cls, iterations : int) -> float :
+        # term 0 plus one term per iteration
+        return arctan_tail_digits(cls.formula.terms, iterations + 1)
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.params, self.needed = machin_terms(self.formula, self.fixed, self.shrink)
+
+    def add_term(self) -> None :
+        """Give each branch of the formula a chance to add another term to
+        their arctan partial sum"""
+
+        for t, needed in zip(self.params, self.needed) :
+            if t.k < needed :
+                t.compute_term()
+
+    def final_compute(self) :
+        if self.fixed :
+            total = sum(t.partial * t.factor for t in self.params)
+            return fixed_to_mpf(total, self.params[0].scale) * 4
+
+        total = number(0)
+        for t in self.params :
+            total += t.partial * t.factor
+
+        return to_mpf(total * 4)
+
+    def sum_terms(self, a : int, b : int) :
+        if self.fixed :
+            scale = self.params[0].scale
+            return sum(p.factor * fixed_arctan_range(p.base, a, min(b, needed), scale)
+                for p, needed in zip(self.formula.terms, self.needed) if a < needed)
+
+        total = mpf(0)
+        for p, needed in zip(self.formula.terms, self.needed) :
+            if a >= needed :
+                continue
+            arg_squared = mpf(p.base)**2
+            power = mpf(1) / mpf(p.base)**(2*a + 1)
+            partial = mpf(0)
+            for k in range(a, min(b, needed)) :
+                new_term = power / (2*k + 1)
+                if k & 1 :
+                    partial -= new_term
+                else :
+                    partial += new_term
+                power /= arg_squared
+
+            total += partial * p.factor
+
+        return total
+
+    def split_series(self) :
+        terms = self.iterations + self.initial_terms
+        return [(p.factor, ArctanSeries(p.base), min(terms, needed))
+                for p, needed in zip(self.formula.terms, self.needed)]
+
+    def final_from_split(self, total) :
+        return total * 4
+
+    def final_from_sum(self, total) :
+        if self.fixed :
+            total = fixed_to_mpf(total, self.params[0].scale)
+
+        return total * 4
@@ -0,0 +1,99 @@
+#
+# Reciprocal and inverse square root by Newton's method.
+#
+# Each Newton step doubles the number of correct digits, so there is
+# no point doing the early steps at full precision. Start from a float
+# (53 bits) and run each step at twice the precision of the one before.
+# The last step at full precision dominates, and the steps before it
+# add up to about as much again - a few full size multiplications in
+# all, rather than a full precision division or square root.
+#
+#   1/x       : y = y + y * (1 - x*y)
+#   1/sqrt(x) : y = y + y * (1 - x*y*y) / 2
+#
+# Without gmpy (python ints) this is many times faster than mpmath's
+# own division and square root at a million digits. With gmpy the
+# reciprocal is still about twice as fast, but GMP's square root beats
+# x * 1/sqrt(x), so sqrt() hands over to it.
+#
+# Below a few thousand digits the overhead of the steps is not worth
+# it and mpmath does the work.
+#
+from typing import List
+
+from mpmath import mp, mpf, workprec
+from mpmath.libmp import BACKEND
+
+# Bits added to each step to cover its rounding
+GUARD_BITS = 20
+
+# About 10,000 digits
+NEWTON_MIN_PREC = 32000
+
+def precisions(prec : int) -> List[int] :
+    """The precision of each Newton step, smallest first, ending above prec"""
+    steps = [prec + GUARD_BITS]
+    while steps[-1] > 2 * 53 :
+        steps.append(steps[-1] // 2 + GUARD_BITS)
+    return steps[::-1]
+
+def reciprocal(x) :
+    """1/x at the current precision"""
+    prec = mp.prec
+    x = mpf(x)
+
+    if prec < NEWTON_MIN_PREC :
+        return 1 / x
+
+    with workprec(53) :
+        y = 1 / x
+
+    for p in precisions(prec) :
+        with workprec(p) :
+            xp = +x
+            y = y + y * (1 - xp * y)
+
+    return +y
+
+def inv_sqrt(x) :
+    """1/sqrt(x) at the current precision"""
+    prec = mp.prec
+    x = mpf(x)
+
+    if prec < NEWTON_MIN_PREC :
+        return 1 / mp.sqrt(x)
+
+    with workprec(53) :
+        y = 1 / mp.sqrt(x)
+
+    for p in precisions(prec) :
+        with workprec(p) :
+            xp = +x
+            y = y + y * (1 - xp * y * y) / 2
+
+    return +y
+
+def sqrt(x) :
+    """sqrt(x) at the current precision.
+    1/sqrt(x) is only needed to half precision: s = x * y is then good
+    to half precision too, and one Newton step for sqrt itself,
+    s + y * (x - s*s) / 2, takes it to full precision (Karp and Markstein)"""
+    prec = mp.prec
+    x = mpf(x)
+
+    if prec < NEWTON_MIN_PREC or BACKEND == 'gmpy' or x == 0 :
+        return mp.sqrt(x)
+
+    half = prec // 2 + GUARD_BITS
+    with workprec(half) :
+        y = inv_sqrt(x)
+        s = x * y
+
+    with workprec(prec + GUARD_BITS) :
+        s = s + y * (x - s * s) / 2
+
+    return +s
+
+def divide(a, b) :
+    """a / b at the current precision"""
+    return a * reciprocal(b)
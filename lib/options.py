@@ -0,0 +1,179 @@
+#
+# `driver` owns the standard command line (-i, -p, -c, -f).
+# Calculators that need more options than that parse their own
+# off the command line first and leave the rest for `driver`.
+#
+import argparse
+import math
+import os
+import sys
+from typing import List, Optional
+
+from lib import backends
+from lib.backends import BACKENDS, use
+from lib.checkpoint import saved_dps
+from lib.formulas import FORMULAS, digits_per_term, find_formula
+from lib.planning import PLAN_GUARD_DIGITS, plan
+from lib.precision import guard_digits
+
+def options_parser() -> argparse.ArgumentParser :
+    return argparse.ArgumentParser(add_help=False)
+
+def add_workers_arg(parser : argparse.ArgumentParser, default : int = 1) -> None :
+    parser.add_argument('-w', '--workers', type=int, default=default,
+                        help="Number of worker processes to use (0 = one per cpu)")
+
+def add_fixed_arg(parser : argparse.ArgumentParser) -> None :
+    parser.add_argument('--fixed', action='store_true',
+                        help="Use fixed point integer arithmetic for the arctan terms")
+
+def add_shrink_arg(parser : argparse.ArgumentParser) -> None :
+    parser.add_argument('--shrink', action='store_true',
+                        help="Compute each arctan term only to the precision it still adds to the sum")
+
+def add_batch_arg(parser : argparse.ArgumentParser) -> None :
+    parser.add_argument('--batch', action='store_true',
+                        help="Sum the terms as float64 in numpy blocks (about 15 digits at most)")
+
+def add_split_arg(parser : argparse.ArgumentParser) -> None :
+    parser.add_argument('--split', action='store_true',
+                        help="Sum the series by binary splitting on exact integers")
+
+def add_formula_arg(parser : argparse.ArgumentParser, default : str) -> None :
+    parser.add_argument('--formula', choices=sorted(FORMULAS) + ['auto'], default=default,
+                        help="Machin-like formula to use ('auto' picks the cheapest for --digits and --workers)")
+
+def add_layers_arg(parser : argparse.ArgumentParser) -> None :
+    parser.add_argument('-l', '--layers', type=int, default=0,
+                        help="Accelerate the partial results with Shanks' transform up to this order (Wynn's epsilon)")
+
+def add_digits_arg(parser : argparse.ArgumentParser) -> None :
+    parser.add_argument('--digits', type=int, default=None, metavar='N',
+                        help="Work out the iterations and precision needed for N correct digits")
+
+def add_backend_arg(parser : argparse.ArgumentParser) -> None :
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='mpmath',
+                        help="Arithmetic to compute with")
+
+def per_iteration(digits : int, iterations : int) -> float :
+    """digits_per_iter for driver to print exactly `digits` digits -
+    digits / iterations can come back just short once multiplied out"""
+    per_iter = digits / iterations
+    while per_iter * iterations < digits :
+        per_iter = math.nextafter(per_iter, math.inf)
+    return per_iter
+
+def limit_extension(parser : argparse.ArgumentParser, args : argparse.Namespace,
+                    calc_class : Optional[type], rest : List[str]) -> None :
+    """A checkpoint only carries the precision it was made at. Extending it
+    past that would print digits that were never computed, so the run
+    is kept at the saved precision and the output cut to what it holds."""
+    if args.checkpoint is None :
+        parser.error("--resume and --extend-to need --checkpoint FILE")
+    try :
+        dps = saved_dps(args.checkpoint)
+    except OSError as e :
+        parser.error(f"cannot read checkpoint {args.checkpoint}: {e.strerror}")
+
+    if calc_class is None or args.extend_to is None :
+        return
+
+    printable = dps - guard_digits(args.extend_to)
+    if args.extend_to * calc_class.digits_per_iter > printable :
+        print(f"warning: {args.checkpoint} was made at {dps} digits - "
+              f"only {printable} digits will be printed", file=sys.stderr)
+        calc_class.digits_per_iter = per_iteration(printable, args.extend_to)
+        rest += ['-p', str(dps)]
+
+def asked_iterations(rest : List[str]) -> Optional[int] :
+    """The -i given for driver, if any"""
+    iterations_parser = argparse.ArgumentParser(add_help=False)
+    iterations_parser.add_argument('-i', '--iterations', type=int, default=None)
+    known, _ = iterations_parser.parse_known_args(rest)
+    return known.iterations
+
+def extra_args(parser : argparse.ArgumentParser, calc_class : Optional[type] = None) -> argparse.Namespace :
+    """Parse the extra options and remove them from sys.argv.
+    If a calculator class is given, each option is also set as
+    a class attribute of the same name."""
+    args, rest = parser.parse_known_args()
+
+    if getattr(args, 'workers', None) == 0 :
+        args.workers = os.cpu_count() or 1
+
+    if getattr(args, 'backend', None) is not None :
+        try :
+            use(args.backend)
+        except ImportError as e :
+            parser.error(f"--backend {args.backend} is not available here: {e}")
+
+        # the terms are made smaller by working at a lower precision,
+        # and fixed point numbers all share the one scale
+        if getattr(args, 'shrink', False) and backends.current.fixed_point :
+            parser.error(f"--shrink needs a floating point backend, not {args.backend} (try --fixed)")
+
+    # driver needs to size the precision and output for the new total
+    if getattr(args, 'extend_to', None) is not None :
+        rest += ['-i', str(args.extend_to)]
+
+    # the table is fed every partial result of the plain loop, and there
+    # is no bound on how far off its estimate is to plan digits from
+    if getattr(args, 'layers', 0) > 0 :
+        for other in ('split', 'batch') :
+            if getattr(args, other, False) :
+                parser.error(f"-l/--layers needs the partial result of every iteration, which --{other} does not give")
+        if getattr(args, 'digits', None) is not None :
+            parser.error("-l/--layers has no error bound to plan --digits from - give -i instead")
+        if getattr(args, 'resume', False) or getattr(args, 'extend_to', None) is not None :
+            parser.error("-l/--layers keeps its table out of the checkpoint, so the run cannot be picked up again")
+
+    # the coordinator only hands out binary splitting ranges
+    if getattr(args, 'listen', None) is not None and getattr(args, 'split', True) is False :
+        parser.error("--listen sends binary splitting ranges to the workers - it needs --split")
+
+    # the formula changes how many terms the digits take, so it comes first
+    if getattr(args, 'formula', None) is not None :
+        try :
+            formula = find_formula(args.formula, getattr(args, 'digits', None),
+                                   getattr(args, 'workers', 1),
+                                   getattr(calc_class, 'arctan_per_worker', False))
+        except ValueError as e :
+            parser.error(f"--formula {args.formula}: {e}")
+
+        if formula != calc_class.formula :
+            calc_class.digits_per_iter = digits_per_term(formula)
+        if args.formula == 'auto' :
+            print(f"using the {formula.name} formula ({formula.origin})", file=sys.stderr)
+        args.formula = calc_class.formula = formula
+
+    # turn the digits wanted into driver's iterations and precision
+    if getattr(args, 'digits', None) is not None :
+        iterations, dps = plan(calc_class, args.digits)
+        print(f"{args.digits} digits needs {iterations} iterations at {dps} digits precision",
+              file=sys.stderr)
+        rest += ['-i', str(iterations), '-p', str(dps)]
+        # driver sizes the output from the digits each iteration gives
+        if calc_class is not None :
+            calc_class.digits_per_iter = per_iteration(args.digits, iterations)
+
+    # the digits of these grow faster than the iterations (the AGM ones
+    # double or quadruple them each time), so no digits_per_iter fits
+    # every run - theirs is only what the first iteration gives. A plain
+    # -i run is sized from the same bound --digits plans from instead
+    # (less the same guard digits)
+    elif getattr(calc_class, 'size_by_tail', False) :
+        iterations = asked_iterations(rest)
+        if iterations is not None and iterations > 0 :
+            digits = max(int(calc_class.tail_digits(iterations)) - PLAN_GUARD_DIGITS, 1)
+            calc_class.digits_per_iter = per_iteration(digits, iterations)
+
+    if getattr(args, 'resume', False) or getattr(args, 'extend_to', None) is not None :
+        limit_extension(parser, args, calc_class, rest)
+
+    sys.argv[1:] = rest
+
+    if calc_class is not None :
+        for key, value in vars(args).items() :
+            setattr(calc_class, key, value)
+
+    return args
@@ -0,0 +1,203 @@
+#
+# Big fixed point numbers that live in files rather than in memory.
+#
+# Each number is a memory mapped file of 64 bit limbs, most significant
+# first. The first limb is the integer part, the rest the fraction.
+# Nothing ever reads a whole number in: the operations go through it a
+# block of limbs at a time, turning each block into a python int
+# (int.from_bytes is linear), working on that and writing it back.
+# Once a block is done its pages are dropped from this process with
+# madvise, so the resident size stays around a few blocks whatever
+# the size of the numbers. The data itself is safe in the page cache
+# and the file.
+#
+# Everything the Machin-like formulas need is "big by small":
+#
+#   dividing by a small int  - most significant block first, the
+#                              remainder carried down to the next block
+#   adding and subtracting   - done in the same pass, a carry out of a
+#                              block is added back into the limbs above
+#                              it (almost always just one of them)
+#   multiplying by small ints - least significant block first
+#
+# Decimal digits come out the same way: multiply the fraction by 10^D
+# and the part that carries out of the top is the next D digits.
+#
+import math
+import mmap
+import os
+from typing import Iterator, List, Tuple
+
+from mpmath.libmp import MPZ
+
+from lib.radix import int_digits
+
+LIMB_BYTES = 8
+LIMB_BITS = 8 * LIMB_BYTES
+
+# Python ints, limb blocks and their copies in flight at once per block
+BLOCK_COPIES = 12
+
+# Fraction limbs beyond the digits asked for, for the truncation of every term
+GUARD_LIMBS = 2
+
+def limbs_for(digits : int) -> int :
+    """Limbs in a number good to `digits` places (the integer limb too)"""
+    return 1 + math.ceil(digits * math.log2(10) / LIMB_BITS) + GUARD_LIMBS
+
+def block_limbs(budget : int) -> int :
+    """Limbs per block to stay within budget bytes"""
+    return max(1024, budget // (BLOCK_COPIES * LIMB_BYTES))
+
+def _page_range(a : int, b : int) -> Tuple[int, int] :
+    start = (a * LIMB_BYTES) // mmap.PAGESIZE * mmap.PAGESIZE
+    return start, b * LIMB_BYTES - start
+
+class LimbFile :
+    """A fixed point number in a memory mapped file of `limbs` limbs"""
+    def __init__(self, path : str, limbs : int) -> None:
+        self.path = path
+        self.limbs = limbs
+
+        with open(path, 'wb') as f :
+            f.truncate(limbs * LIMB_BYTES)
+        self.file = open(path, 'r+b')
+        self.map = mmap.mmap(self.file.fileno(), limbs * LIMB_BYTES)
+
+    def read(self, a : int, b : int) -> int :
+        """Limbs [a, b) as one int"""
+        return int.from_bytes(self.map[a * LIMB_BYTES : b * LIMB_BYTES], 'big')
+
+    def write(self, a : int, b : int, value : int) -> None :
+        self.map[a * LIMB_BYTES : b * LIMB_BYTES] = value.to_bytes((b - a) * LIMB_BYTES, 'big')
+
+    def release(self, a : int, b : int) -> None :
+        """Let go of the pages holding limbs [a, b)"""
+        start, length = _page_range(a, b)
+        if length > 0 :
+            self.map.madvise(mmap.MADV_DONTNEED, start, length)
+
+    def carry_into(self, a : int, carry : int) -> None :
+        """Add carry (+1 or -1) to the limbs above limb a"""
+        i = a - 1
+        while carry and i >= 0 :
+            limb = self.read(i, i + 1) + carry
+            carry = limb >> LIMB_BITS
+            self.write(i, i + 1, limb & ((1 << LIMB_BITS) - 1))
+            i -= 1
+
+    def blocks(self, block : int, start : int = 0, end : int = -1, reverse : bool = False) -> List[Tuple[int, int]] :
+        end = self.limbs if end < 0 else end
+        ranges = [(a, min(a + block, end)) for a in range(start, end, block)]
+        return ranges[::-1] if reverse else ranges
+
+    def close(self, delete : bool = True) -> None :
+        self.map.close()
+        self.file.close()
+        if delete :
+            os.remove(self.path)
+
+class DiskArctan :
+    """factor * arctan(1/base) with its power and partial sum in files"""
+    def __init__(self, factor : int, base : int, limbs : int, directory : str, block : int) -> None:
+        self.factor = factor
+        self.base = base
+        self.base_squared = base * base
+        self.block = block
+        self.k : int = 0
+        self.divisor : int = 1
+
+        self.power = LimbFile(os.path.join(directory, f'power-{base}.limbs'), limbs)
+        self.partial = LimbFile(os.path.join(directory, f'partial-{base}.limbs'), limbs)
+
+        # power = partial = 1/base
+        self.power.write(0, 1, 1)
+        remainder = 0
+        for a, b in self.power.blocks(block) :
+            value, remainder = divmod((remainder << (LIMB_BITS * (b - a))) | self.power.read(a, b), base)
+            self.power.write(a, b, value)
+            self.partial.write(a, b, value)
+            self.power.release(a, b)
+            self.partial.release(a, b)
+
+        # the power only gets smaller, so the limbs ahead of this stay 0
+        self.lead : int = 0
+        self._skip_zeros()
+
+    def _skip_zeros(self) -> None :
+        while self.lead < self.power.limbs and self.power.read(self.lead, self.lead + 1) == 0 :
+            self.lead += 1
+
+    def compute_term(self) -> None :
+        """power /= base^2 and partial -/+= power / divisor, in one pass"""
+        self.k += 1
+        self.divisor += 2
+        subtract = self.k & 1
+
+        power_rem = 0
+        term_rem = 0
+        for a, b in self.power.blocks(self.block, self.lead) :
+            bits = LIMB_BITS * (b - a)
+
+            power, power_rem = divmod((power_rem << bits) | self.power.read(a, b), self.base_squared)
+            self.power.write(a, b, power)
+
+            term, term_rem = divmod((term_rem << bits) | power, self.divisor)
+
+            partial = self.partial.read(a, b)
+            partial = partial - term if subtract else partial + term
+            carry = partial >> bits
+            self.partial.write(a, b, partial & ((1 << bits) - 1))
+            if carry :
+                self.partial.carry_into(a, carry)
+
+            self.power.release(a, b)
+            self.partial.release(a, b)
+
+        self._skip_zeros()
+
+    def close(self) -> None :
+        self.power.close()
+        self.partial.close()
+
+def combine(terms : List[DiskArctan], multiplier : int, out : LimbFile, block : int) -> None :
+    """out = multiplier * sum of factor * arctan"""
+    carry = 0
+    for a, b in out.blocks(block, reverse=True) :
+        bits = LIMB_BITS * (b - a)
+        value = carry
+        for t in terms :
+            value += multiplier * t.factor * t.partial.read(a, b)
+            t.partial.release(a, b)
+        carry = value >> bits
+        out.write(a, b, value & ((1 << bits) - 1))
+        out.release(a, b)
+
+def decimal_digits(number : LimbFile, digits : int, block : int) -> Iterator[str] :
+    """The decimal expansion '3.14159...' of the number in chunks,
+    truncated to `digits` places. The fraction is used up as it goes."""
+    yield str(number.read(0, 1)) + '.'
+
+    produced = 0
+    while produced < digits :
+        count = min(digits - produced, max(1, int(block * LIMB_BITS * math.log10(2))))
+        scale = MPZ(10)**count
+
+        # only the limbs that still matter to the digits left
+        needed = (digits - produced) * math.log2(10) / LIMB_BITS
+        end = min(number.limbs, 1 + math.ceil(needed) + GUARD_LIMBS)
+
+        carry = 0
+        for a, b in number.blocks(block, 1, end, reverse=True) :
+            bits = LIMB_BITS * (b - a)
+            value = MPZ(number.read(a, b)) * scale + carry
+            carry = value >> bits
+            number.write(a, b, int(value & ((1 << bits) - 1)))
+            number.release(a, b)
+
+        yield from int_digits(carry, count)
+        produced += count
+
+def peak_rss_kb() -> int :
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
@@ -0,0 +1,59 @@
+#
+# Parallel evaluation for series whose terms are independent.
+#
+# A calculator that can sum any range of its terms [a, b) directly
+# (without having computed the terms before a) can have its
+# iterations cut into chunks, each summed by a worker process.
+# The partial sums are then simply added together.
+#
+from multiprocessing import Pool
+from typing import Tuple
+
+from mpmath import mp, mpf
+
+from lib.common import BaseCalc
+from lib.progress import REPORT_SECONDS, Progress
+
+class RangeCalc(BaseCalc) :
+    # Set to more than 1 to sum the terms in a pool of processes
+    workers : int = 1
+
+    # Number of terms already in the sum when the calculator is created.
+    # The sequential run covers terms [0, iterations + initial_terms)
+    initial_terms : int = 1
+
+    report_every : float = REPORT_SECONDS
+
+    def sum_terms(self, a : int, b : int) :
+        """Return the sum of the terms with index in [a, b)"""
+        pass
+
+    def final_from_sum(self, total) :
+        """Turn the sum of all the terms into pi"""
+        pass
+
+    def approx_pi(self) :
+        if self.workers <= 1 :
+            return super().approx_pi()
+
+        terms = self.iterations + self.initial_terms
+
+        # A few chunks per worker so progress can be reported
+        pieces = min(terms, self.workers * 4)
+        bounds = [terms * i // pieces for i in range(pieces + 1)]
+        chunks = [(self, a, b, mp.dps) for a, b in zip(bounds, bounds[1:])]
+
+        total = mpf(0)
+
+        with Pool(self.workers) as pool, \
+                Progress(pieces, self.report_every, unit='chunks') as progress :
+            for i, part in enumerate(pool.imap(_sum_chunk, chunks)) :
+                total += part
+                progress.count = i + 1
+
+        return self.final_from_sum(total)
+
+def _sum_chunk(chunk : Tuple[RangeCalc, int, int, int]) :
+    calc, a, b, dps = chunk
+    mp.dps = dps
+    return calc.sum_terms(a, b)
@@ -0,0 +1,91 @@
+#
+# Work out up front how many terms a run needs.
+#
+# Each calculator can say how many digits are guaranteed correct
+# after a number of iterations (from a bound on the tail of its
+# series) with a classmethod
+#
+#     tail_digits(iterations) -> float
+#
+# From that we search for the fewest iterations that reach the
+# digits asked for, and the working precision to use.
+#
+# An error below 10**-N is not enough to print N right digits: pi
+# could be 0.3 units past a digit boundary with the sum 0.5 units
+# short of it. So the plan goes PLAN_GUARD_DIGITS further. Then the
+# N-th digit can only be off when the digits of pi after it are
+# PLAN_GUARD_DIGITS 0s or 9s in a row.
+#
+import math
+from typing import Iterable, Tuple
+
+from lib.precision import guard_digits
+
+PLAN_GUARD_DIGITS : int = 2
+
+def plan(calc_class : type, digits : int) -> Tuple[int, int] :
+    """Fewest iterations whose tail bound is below 10**-(digits + guard),
+    and the working precision (in digits) for that run"""
+    tail_digits = calc_class.tail_digits
+    target = digits + PLAN_GUARD_DIGITS
+
+    if tail_digits(1) >= target :
+        iterations = 1
+    else :
+        # find a big enough count, then bisect back down to the smallest
+        low, high = 1, 2
+        while tail_digits(high) < target :
+            low, high = high, high * 2
+
+        while high - low > 1 :
+            mid = (low + high) // 2
+            if tail_digits(mid) >= target :
+                high = mid
+            else :
+                low = mid
+        iterations = high
+
+    return iterations, target + guard_digits(iterations)
+
+def alternating_tail_digits(next_term : float) -> float :
+    """An alternating series with shrinking terms is off by less than its next term"""
+    return -math.log10(next_term)
+
+def arctan_tail_digits(params : Iterable[Tuple[int, int]], terms : int) -> float :
+    """pi = 4 * sum(factor * arctan(1/base)) with `terms` terms of each arctan.
+    Each arctan is an alternating series, so its tail is below the next
+    term 1 / ((2n+1) * base**(2n+1))"""
+    n = terms
+    logs = [math.log10(4 * abs(factor)) - math.log10(2*n + 1) - (2*n + 1) * math.log10(base)
+            for factor, base in params]
+
+    # log10 of the sum, rounded up
+    return -(max(logs) + math.log10(len(logs)))
+
+# The ratio of one Chudnovsky term to the one before is below
+#   24 * (6k+1)(6k+3)(6k+5) / ((k+1)**3 * 640320**3) * (A + B(k+1)) / (A + Bk)
+#   < 24 * 216 * 2 / 640320**3
+CHUDNOVSKY_RATIO = 24 * 216 * 2 / 640320**3
+
+def chudnovsky_tail_digits(terms : int) -> float :
+    """The sum starts at 13591409 and the tail after `terms` terms is
+    below that times ratio**terms / (1 - ratio). pi is about 3, and its
+    relative error is the sum's relative error."""
+    return terms * -math.log10(CHUDNOVSKY_RATIO) + math.log10(1 - CHUDNOVSKY_RATIO) - math.log10(4)
+
+# agm(1, 1/sqrt(2))
+AGM_1_ROOT_HALF = 0.8472130847939790
+
+def gauss_legendre_tail_digits(iterations : int) -> float :
+    """Salamin's bound: pi - pi_n <= pi**2 * 2**(n+4) * exp(-pi * 2**(n+1)) / agm**2"""
+    n = iterations
+    log_error = (2 * math.log(math.pi) + (n + 4) * math.log(2) - math.pi * 2**(n + 1)
+                 - 2 * math.log(AGM_1_ROOT_HALF))
+    return -log_error / math.log(10)
+
+def borwein_quartic_tail_digits(iterations : int) -> float :
+    """Borwein's bound: 0 < a_n - 1/pi < 16 * 4**n * exp(-2 * pi * 4**n),
+    and pi's error is about pi**2 times that"""
+    n = iterations
+    log_error = 2 * math.log(math.pi) + math.log(16) + n * math.log(4) - 2 * math.pi * 4**n
+    return -log_error / math.log(10)
@@ -0,0 +1,51 @@
+#
+# Working precision for the terms of arctan(1/b).
+#
+# Term k of arctan(1/b) is about b**-(2k+1), so it is already
+# (2k+1) * log10(b) digits below the decimal point. To get D digits
+# of the sum, term k only needs D - (2k+1) * log10(b) digits of its own
+# (plus guard digits), and that shrinks steadily as the run goes on.
+# TermPrecision.next_term takes one step of the series at that precision,
+# on whichever backend is in use.
+#
+# Guard digits:
+#   Each term is built from the one before it, and each step rounds at
+#   that term's precision. Term k therefore carries a relative error of
+#   at most k units in its last place - an absolute error of k * 10**-(D+guard).
+#   Summed over at most K terms that is below K**2 * 10**-(D+guard), so
+#   2*log10(K) guard digits (plus a few spare) keep the total error
+#   below one unit in the last place of the full precision sum.
+#
+import math
+from typing import Any, Tuple
+
+from lib.backends import working_precision
+
+# never drop below ordinary float precision
+MIN_DPS : int = 15
+
+SPARE_DIGITS : int = 5
+
+def guard_digits(terms : int) -> int :
+    return 2 * math.ceil(math.log10(terms + 1)) + SPARE_DIGITS
+
+class TermPrecision :
+    def __init__(self, base : int, digits : int) -> None:
+        self.base = base
+        self.base_squared = base * base
+        self.log_base = math.log10(base)
+
+        # after this many terms the terms are below 10**-digits
+        terms = int(digits / (2 * self.log_base)) + 2
+        self.needed = digits + guard_digits(terms)
+
+    def dps(self, k : int) -> int :
+        """Digits term k still contributes to the sum"""
+        return max(self.needed - int((2*k + 1) * self.log_base), MIN_DPS)
+
+    def next_term(self, power, k : int, sign : int, divisor) -> Tuple[Any, Any] :
+        """The power and the (signed) term k from the power of term k - 1,
+        both only worked out to the digits term k still adds to the sum"""
+        with working_precision(self.dps(k)) :
+            power /= self.base_squared
+            return power, power * sign / divisor
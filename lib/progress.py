@@ -0,0 +1,124 @@
+#
+# Progress reports from a background thread.
+#
+# The loop only stores how far it has got (progress.count = k), which
+# costs next to nothing next to a term. A thread wakes up every few
+# seconds, reads the count and prints (to stderr, clear of the digits)
+# how far along the run is, the iterations per second since the last
+# report and when it should be done.
+#
+# Terms get dearer as a run goes on (the numbers they work on get
+# longer), so the rate so far makes a poor guess at the time left.
+# Instead - as was done by hand for euler in the README - the elapsed
+# time is fitted to a power of the iterations done, a straight line on
+# a log/log graph, and that line is followed out to the last iteration.
+#
+# Calculators with no loop of their own (no checkpoints) get the same
+# reports by listing ProgressCalc in their bases.
+#
+import argparse
+import datetime
+import math
+import sys
+import threading
+import time
+from typing import List, Optional, TextIO, Tuple
+
+from lib.common import BaseCalc
+
+# Seconds between reports
+REPORT_SECONDS = 5.0
+
+def add_progress_arg(parser : argparse.ArgumentParser) -> None :
+    parser.add_argument('--report-every', type=float, default=REPORT_SECONDS, metavar='SECONDS',
+                        help="Seconds between progress reports")
+
+def fit_power(samples : List[Tuple[int, float]]) -> Optional[Tuple[float, float]] :
+    """Least squares fit of log(seconds) = log(c) + p * log(iterations)
+    to (iterations, seconds) samples. Returns (c, p)"""
+    points = [(math.log(n), math.log(t)) for n, t in samples if n > 0 and t > 0]
+    if len(points) < 2 :
+        return None
+
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    sxx = sum((x - mean_x)**2 for x, _ in points)
+    if sxx == 0 :
+        return None
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+
+    slope = sxy / sxx
+    return math.exp(mean_y - slope * mean_x), slope
+
+def _duration(seconds : float) -> datetime.timedelta :
+    return datetime.timedelta(seconds=round(seconds))
+
+class Progress :
+    """Report the progress of a loop through `total` iterations.
+    Use it as a context manager and set count as the loop goes."""
+    def __init__(self, total : int, every : float = REPORT_SECONDS, start : int = 0,
+                 unit : str = 'iterations', out : Optional[TextIO] = None) -> None:
+        self.total = total
+        self.every = every
+        self.start = start
+        self.unit = unit
+        self.out = out
+
+        self.count : int = start
+        # (iterations done, seconds) at each report
+        self.samples : List[Tuple[int, float]] = []
+        self.started : float = 0.0
+        self.stopping = threading.Event()
+        self.thread : Optional[threading.Thread] = None
+
+    def __enter__(self) -> 'Progress' :
+        self.started = time.perf_counter()
+        if self.every > 0 :
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None :
+        self.stopping.set()
+        if self.thread is not None :
+            self.thread.join()
+
+    def _run(self) -> None :
+        while not self.stopping.wait(self.every) :
+            self.report()
+
+    def estimate(self) -> Optional[float] :
+        """Seconds the whole loop should take, from the fit so far"""
+        fit = fit_power(self.samples)
+        if fit is None :
+            return None
+        c, p = fit
+        return c * (self.total - self.start)**p
+
+    def report(self) -> None :
+        elapsed = time.perf_counter() - self.started
+        done = self.count - self.start
+
+        last_done, last_elapsed = self.samples[-1] if self.samples else (0, 0.0)
+        rate = (done - last_done) / max(elapsed - last_elapsed, 1e-9)
+        self.samples.append((done, elapsed))
+
+        line = f"{self.count:6} of {self.total} ({_duration(elapsed)}) {rate:10.1f} {self.unit}/sec"
+        finish = self.estimate()
+        if finish is not None :
+            line += f"  eta {_duration(max(finish - elapsed, 0.0))}"
+
+        print(line, file=self.out or sys.stderr, flush=True)
+
+class ProgressCalc(BaseCalc) :
+    """The add_term loop, reported on every report_every seconds"""
+    report_every : float = REPORT_SECONDS
+
+    def approx_pi(self) :
+        with Progress(self.iterations, self.report_every) as progress :
+            for i in range(self.iterations) :
+                self.k = i + 1
+                self.add_term()
+                progress.count = i + 1
+
+        return self.final_compute()
@@ -0,0 +1,157 @@
+#
+# Divide and conquer binary to decimal conversion.
+#
+# str() of a million digit number converts it one small piece at a
+# time, which is quadratic in the number of digits. Instead, split
+# the number in two with one divmod by a big power of 10, convert
+# each half the same way, and stop once the pieces are small enough
+# for str().
+#
+# With GMP the divmods are fast. Without it python's own division is
+# quadratic, so the number is first moved into a decimal.Decimal (by
+# splitting on powers of 2, which needs only multiplies) where a
+# divmod by a power of 10 is just a shift.
+#
+# The digits come out as a series of chunks (strings) from left
+# to right so the output stage never needs one giant string.
+#
+import decimal
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Tuple
+
+from mpmath.libmp import BACKEND, MPZ
+
+# Pieces this small are handed to str()
+LEAF_DIGITS = 1000
+
+# Exact arithmetic on as many digits as needed
+DECIMAL = decimal.Context(prec=decimal.MAX_PREC, Emax=decimal.MAX_EMAX,
+                          Emin=decimal.MIN_EMIN, traps=[decimal.Inexact])
+
+LEAF_BITS = 3000
+
+def _to_decimal(n : int, bits : int, powers : Dict[int, decimal.Decimal]) -> decimal.Decimal :
+    if bits <= LEAF_BITS :
+        return decimal.Decimal(n)
+
+    low_bits = bits >> 1
+    high = n >> low_bits
+    low = n - (high << low_bits)
+
+    if low_bits not in powers :
+        powers[low_bits] = DECIMAL.power(decimal.Decimal(2), low_bits)
+
+    return DECIMAL.add(
+        DECIMAL.multiply(_to_decimal(high, bits - low_bits, powers), powers[low_bits]),
+        _to_decimal(low, low_bits, powers))
+
+class PowerCache :
+    """10**(LEAF_DIGITS * 2**i), each computed only once"""
+    def __init__(self, use_decimal : bool) -> None:
+        self.use_decimal = use_decimal
+        self.powers : Dict[int, int] = {}
+
+    def get(self, level : int) :
+        if level not in self.powers :
+            if level > 0 :
+                half = self.get(level - 1)
+                self.powers[level] = DECIMAL.multiply(half, half) if self.use_decimal else half * half
+            elif self.use_decimal :
+                self.powers[0] = DECIMAL.power(decimal.Decimal(10), LEAF_DIGITS)
+            else :
+                self.powers[0] = MPZ(10)**LEAF_DIGITS
+
+        return self.powers[level]
+
+    def divmod(self, n, level : int) :
+        if self.use_decimal :
+            return DECIMAL.divmod(n, self.get(level))
+        return divmod(n, self.get(level))
+
+def _split_level(width : int) -> int :
+    """The biggest level whose power has fewer digits than width"""
+    level = 0
+    while LEAF_DIGITS << (level + 1) < width :
+        level += 1
+    return level
+
+def _convert(n, width : int, cache : PowerCache) -> Iterator[str] :
+    """Yield exactly `width` digits of n (with leading zeros), n < 10**width"""
+    if width <= LEAF_DIGITS :
+        yield str(n).zfill(width)
+        return
+
+    level = _split_level(width)
+    high, low = cache.divmod(n, level)
+
+    yield from _convert(high, width - (LEAF_DIGITS << level), cache)
+    yield from _convert(low, LEAF_DIGITS << level, cache)
+
+def _convert_piece(piece : Tuple[object, int]) -> str :
+    n, width = piece
+    return ''.join(_convert(n, width, PowerCache(isinstance(n, decimal.Decimal))))
+
+def int_digits(n : int, width : int, workers : int = 1) -> Iterator[str] :
+    """Yield exactly `width` decimal digits of n in chunks.
+    With more than one worker the top levels of the split are done
+    here and the pieces converted in a pool of processes."""
+    use_decimal = BACKEND == 'python'
+    if use_decimal :
+        n = _to_decimal(n, n.bit_length(), {})
+    else :
+        n = MPZ(n)
+
+    cache = PowerCache(use_decimal)
+
+    if workers <= 1 :
+        yield from _convert(n, width, cache)
+        return
+
+    pieces : List[Tuple[object, int]] = [(n, width)]
+    while len(pieces) < workers and pieces[0][1] > LEAF_DIGITS :
+        split : List[Tuple[object, int]] = []
+        for n, width in pieces :
+            if width <= LEAF_DIGITS :
+                split.append((n, width))
+                continue
+            level = _split_level(width)
+            high, low = cache.divmod(n, level)
+            split += [(high, width - (LEAF_DIGITS << level)), (low, LEAF_DIGITS << level)]
+        pieces = split
+
+    with Pool(workers) as pool :
+        yield from pool.imap(_convert_piece, pieces)
+
+def digit_chunks(value, digits : int, workers : int = 1) -> Iterator[str] :
+    """Yield the decimal expansion of a positive mpf, truncated to
+    `digits` places after the decimal point, as a series of strings.
+    The first chunk is the integer part and the '.'"""
+    man, exp = value.man_exp
+    man = MPZ(man)
+
+    if exp >= 0 :
+        whole = man << exp
+        fraction = MPZ(0)
+    else :
+        # value = man / 2**-exp, so the digits of the fraction
+        # need only a multiply and a shift
+        whole = man >> -exp
+        fraction = ((man - (whole << -exp)) * MPZ(10)**digits) >> -exp
+
+    yield str(whole) + '.'
+    yield from int_digits(fraction, digits, workers)
+
+def _from_digits(digits : str, cache : PowerCache) :
+    if len(digits) <= LEAF_DIGITS :
+        return MPZ(int(digits or '0'))
+
+    level = _split_level(len(digits))
+    split = len(digits) - (LEAF_DIGITS << level)
+
+    return _from_digits(digits[:split], cache) * cache.get(level) + _from_digits(digits[split:], cache)
+
+def int_from_digits(digits : str) :
+    """The integer a decimal digit string stands for - int_digits the other way round.
+    Split the same way, so it is a few big multiplies rather than int()'s
+    quadratic (and, for long strings, refused) conversion."""
+    return _from_digits(digits, PowerCache(False))
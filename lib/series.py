@@ -0,0 +1,130 @@
+#
+# Binary splitting for series whose terms have a rational ratio.
+#
+# The series is
+#
+#   S = sum over n of  a(n)/b(n) * p(0)...p(n) / (q(0)...q(n))
+#
+# with small integer a, b, p and q. Each term is then the one before
+# it times p(n)/q(n) (give or take the a/b factor), which covers the
+# arctan, Leibniz, Nilakantha and Euler series.
+#
+# The terms in [a, b) are folded into four exact integers
+#   P = p(a)...p(b-1)   Q = q(a)...q(b-1)   B = b(a)...b(b-1)
+#   T with  sum[a, b) = T / (B * Q)
+# by splitting the range in half and combining the halves, so the
+# work is a few big multiplications rather than one full precision
+# division per term. See lib/binsplit.py for the Chudnovsky version.
+#
+from typing import List, Tuple
+
+from mpmath import mpf
+from mpmath.libmp import MPZ
+
+from lib import binsplit
+from lib.cluster import cluster
+from lib.parallel import RangeCalc
+
+PQBT = Tuple[int, int, int, int]
+
+class Series :
+    """The terms of a series. Anything not given is 1."""
+    def a(self, n : int) -> int :
+        return 1
+
+    def b(self, n : int) -> int :
+        return 1
+
+    def p(self, n : int) -> int :
+        return 1
+
+    def q(self, n : int) -> int :
+        return 1
+
+class ArctanSeries(Series) :
+    """arctan(1/base) = sum (-1)^n / ((2n+1) * base^(2n+1))"""
+    def __init__(self, base : int) -> None:
+        self.base = base
+
+    def b(self, n : int) -> int :
+        return 2*n + 1
+
+    def p(self, n : int) -> int :
+        return -1 if n > 0 else 1
+
+    def q(self, n : int) -> int :
+        return self.base * self.base if n > 0 else self.base
+
+def split(series : Series, a : int, b : int) -> PQBT :
+    """Compute P, Q, B and T for the terms in [a, b)"""
+    if b - a == 1 :
+        p = MPZ(series.p(a))
+        return p, MPZ(series.q(a)), MPZ(series.b(a)), p * series.a(a)
+
+    m = (a + b) // 2
+
+    return combine(split(series, a, m), split(series, m, b))
+
+def combine(left : PQBT, right : PQBT) -> PQBT :
+    """Merge the P, Q, B, T of two adjacent ranges [a, m) and [m, b)"""
+    p_am, q_am, b_am, t_am = left
+    p_mb, q_mb, b_mb, t_mb = right
+
+    p, q, b, t = (p_am * p_mb, q_am * q_mb, b_am * b_mb,
+                  b_mb * q_mb * t_am + b_am * p_am * t_mb)
+    if binsplit.on_combine is not None :
+        binsplit.on_combine(p, q, b, t)
+
+    return p, q, b, t
+
+def split_parallel(series : Series, a : int, b : int, workers : int, pool = None) -> PQBT :
+    """split() with subranges handed to a pool of worker processes
+    (or to anything else with Pool's map)"""
+    return binsplit.parallel_split(split, combine, a, b, workers, pool, (series,))
+
+def series_sum(series : Series, terms : int, workers : int = 1, pool = None) :
+    """The sum of the first `terms` terms at the current precision"""
+    if terms <= 0 :
+        return mpf(0)
+
+    if (workers > 1 or pool is not None) and terms > 1 :
+        _, q, b, t = split_parallel(series, 0, terms, workers, pool)
+    else :
+        _, q, b, t = split(series, 0, terms)
+
+    return mpf(t) / (b * q)
+
+class SplitCalc(RangeCalc) :
+    """A calculator whose series can also be summed by binary splitting.
+
+    With split set the terms [0, iterations + initial_terms) of each
+    series from split_series() are summed in one go and the weighted
+    total is handed to final_from_split. List StagedCalc ahead of it
+    so the phases are recorded.
+
+    With --listen (see lib/cluster.py) the ranges go to cluster workers,
+    which need to be able to import the series - so only the ones in lib,
+    such as ArctanSeries, can be sent."""
+    split : bool = False
+
+    def split_series(self) -> List[Tuple[int, Series, int]] :
+        """(weight, series, terms to sum) for each series in the sum"""
+        pass
+
+    def final_from_split(self, total) :
+        return self.final_from_sum(total)
+
+    def approx_pi(self) :
+        if not self.split :
+            return super().approx_pi()
+
+        instrument = getattr(self, 'instrument', None)
+        record = instrument.record if instrument is not None else None
+
+        with self.phase('split'), binsplit.watch(record), cluster(self) as pool :
+            total = mpf(0)
+            for weight, series, terms in self.split_series() :
+                total += weight * series_sum(series, terms, self.workers, pool)
+
+        with self.phase('final') :
+            return self.final_from_split(total)
@@ -0,0 +1,91 @@
+#
+# Unbounded spigot for the digits of pi.
+#
+# Gibbons' streaming algorithm on Gosper's series
+#
+#   pi = 3 + 1*1/(3*4*5) * (8 + 2*3/(3*7*8) * (13 + 3*5/(3*10*11) * (18 + ...)))
+#
+# The state is one linear fractional transform x -> (q*x + r) / t,
+# and pi is that applied to the rest of the series. Term i is
+#
+#   x -> (i*(2i-1) * x + u*(5i-2)) / u      with u = 3*(3i+1)*(3i+2)
+#
+# and whatever the rest of the series from term i is, it lies between
+# 5i-2 and 6i. So once the transform maps both ends of that range to
+# numbers that start with the same digits, those digits are final and
+# can be handed out (and taken back off the state).
+#
+# Gibbons takes one term and one digit at a time, which costs a full
+# size division per digit. Here a batch of terms is folded into one
+# transform by binary splitting first, and all the digits the batch
+# settles are taken with one division - each term settles about
+# log10(27/2) = 1.13 digits. The batches grow with the number of digits
+# out so far (so the first digits come straight away) up to a limit
+# that keeps the wait between batches short.
+#
+# The state is exact, so it grows by a few dozen bits per digit - a
+# few MB at a million digits.
+#
+import math
+from typing import Iterator, Tuple
+
+from mpmath.libmp import MPZ
+
+LFT = Tuple[int, int, int]
+
+# digits settled by each term
+DIGITS_PER_TERM : float = math.log10(27 / 2)
+
+MIN_BATCH_TERMS : int = 16
+MAX_BATCH_TERMS : int = 3000
+
+def gosper_terms(a : int, b : int) -> LFT :
+    """The transforms for the terms [a, b) composed into one"""
+    if b - a == 1 :
+        u = 3 * (3*a + 1) * (3*a + 2)
+        return MPZ(a * (2*a - 1)), MPZ(u * (5*a - 2)), MPZ(u)
+
+    m = (a + b) // 2
+    return compose(gosper_terms(a, m), gosper_terms(m, b))
+
+def compose(outer : LFT, inner : LFT) -> LFT :
+    """outer(inner(x))"""
+    q1, r1, t1 = outer
+    q2, r2, t2 = inner
+    return q1 * q2, q1 * r2 + r1 * t2, t1 * t2
+
+def pi_digits() -> Iterator[str] :
+    """The digits of pi as a never ending series of chunks ('3.14159', '26535', ...)"""
+    # 3 + x/60 for the series from term 2 on
+    q, r, t = MPZ(1), MPZ(180), MPZ(60)
+    i : int = 2
+    emitted : int = 0
+
+    while True :
+        terms = min(MAX_BATCH_TERMS, max(MIN_BATCH_TERMS, emitted // 8))
+        q, r, t = compose((q, r, t), gosper_terms(i, i + terms))
+        i += terms
+
+        # the state maps the rest of the series, somewhere in [5i-2, 6i],
+        # to what is left of pi; take the digits both ends agree on
+        count = int(terms * DIGITS_PER_TERM)
+        scale = MPZ(10)**(count - 1)
+        low = (q * (5*i - 2) + r) * scale // t
+        high = (q * (6*i) + r) * scale // t
+        while low != high and count > 0 :
+            low //= 10
+            high //= 10
+            count -= 1
+
+        if count == 0 :
+            continue
+
+        digits = str(low).zfill(count)
+        if emitted == 0 :
+            digits = digits[0] + '.' + digits[1:]
+        yield digits
+
+        # what is left is (value * 10^(count-1) - low) * 10
+        power = MPZ(10)**count
+        q, r = q * power, r * power - 10 * low * t
+        emitted += count
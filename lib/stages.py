@@ -0,0 +1,73 @@
+#
+# Stages that run around the calculation itself.
+#
+# `driver` only knows how to run approx_pi and print the result.
+# Calculators that derive from StagedCalc get the extra stages
+# (such as checking the result and timing each phase) wrapped
+# around approx_pi.
+# A calculator that overrides approx_pi itself should hand its
+# own computation to run_stages.
+#
+import argparse
+import contextlib
+import sys
+from typing import Callable, Optional
+
+from mpmath import mp
+
+from lib.common import BaseCalc
+from lib.instrument import Instrument
+from lib.verify import report, verify_value
+
+def add_stage_args(parser : argparse.ArgumentParser) -> None :
+    parser.add_argument('--verify', metavar='REFERENCE', default=None,
+                        help="Check the result against this file of known digits")
+    parser.add_argument('--report', metavar='FILE', default=None,
+                        help="Write the time, memory and operand size of each phase as JSON")
+    parser.add_argument('--trace', metavar='FILE', default=None,
+                        help="Write the phases as a Chrome trace file")
+
+class StagedCalc(BaseCalc) :
+    verify : Optional[str] = None
+    report : Optional[str] = None
+    trace : Optional[str] = None
+
+    instrument : Optional[Instrument] = None
+
+    def approx_pi(self) :
+        return self.run_stages(super().approx_pi)
+
+    def phase(self, name : str) :
+        """Mark a phase of the computation (when instrumented)"""
+        if self.instrument is None :
+            return contextlib.nullcontext()
+        return self.instrument.phase(name)
+
+    def run_stages(self, compute : Callable) :
+        if self.report is not None or self.trace is not None :
+            self.instrument = Instrument(self.name)
+            self.instrument.attach(self)
+
+        with self.phase('compute') :
+            pi = compute()
+
+        if self.instrument is not None :
+            self.instrument.end('terms')
+
+        if self.verify is not None :
+            with self.phase('verify') :
+                result = verify_value(pi, mp.dps, self.verify)
+            print(report(result, self.verify), file=sys.stderr)
+
+        if self.instrument is not None :
+            if self.report is not None :
+                self.instrument.write_report(self.report)
+            if self.trace is not None :
+                self.instrument.write_trace(self.trace)
+
+        return pi
+
+    def __getstate__(self) :
+        # the instrument and its hooks stay in this process
+        return {key : value for key, value in vars(self).items()
+                if key != 'instrument' and not callable(value)}
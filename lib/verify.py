@@ -0,0 +1,119 @@
+#
+# Check computed digits against a reference file.
+#
+# Both files are memory mapped and compared in large blocks. Once a
+# block differs it is cut in half over and over to find the first
+# mismatch. Neither file is ever read into memory as a whole, so the
+# reference can be far bigger than the bundled million digits.
+#
+# Files in the formatted layout (see format_pi.py) are first turned
+# back into a plain digit string in a temporary file.
+#
+import mmap
+import os
+import tempfile
+import time
+from typing import IO, NamedTuple, Optional
+
+from lib.formatter import unformat, write_plain
+from lib.radix import digit_chunks
+
+BLOCK_SIZE = 1 << 20
+
+VerifyResult = NamedTuple('VerifyResult', correct=int, compared=int,
+                          mismatch=Optional[int], seconds=float)
+
+def first_mismatch(a, b, length : int) -> int :
+    """Offset of the first byte that differs in a[:length] and b[:length],
+    or length if they are the same."""
+    for start in range(0, length, BLOCK_SIZE) :
+        end = min(start + BLOCK_SIZE, length)
+        if a[start:end] == b[start:end] :
+            continue
+
+        # bisect down to the first differing byte
+        while end - start > 1 :
+            mid = (start + end) // 2
+            if a[start:mid] == b[start:mid] :
+                start = mid
+            else :
+                end = mid
+
+        return start
+
+    return length
+
+def _digit_end(m) -> int :
+    """Length without any trailing whitespace"""
+    end = len(m)
+    while end > 0 and m[end-1:end].isspace() :
+        end -= 1
+    return end
+
+def is_formatted(path : str) -> bool :
+    # a plain digit string never has a '|', the formatted layout
+    # has one on every line (perhaps after a few progress lines)
+    with open(path, 'rb') as f :
+        return b'|' in f.read(1 << 16)
+
+def plain_copy(path : str) -> IO[str] :
+    """A temporary file holding the formatted file as a plain digit string"""
+    tmp = tempfile.NamedTemporaryFile('w+', suffix='.txt')
+    with open(path) as f :
+        write_plain(unformat(f), tmp)
+    return tmp
+
+def _map(f : IO) :
+    if os.fstat(f.fileno()).st_size == 0 :
+        return b''
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def verify_files(output : str, reference : str) -> VerifyResult :
+    """Compare two digit strings like '3.14159...' and count
+    the digits after the decimal point that agree."""
+    start_time = time.perf_counter()
+
+    temps = []
+    if is_formatted(output) :
+        temps.append(plain_copy(output))
+        output = temps[-1].name
+    if is_formatted(reference) :
+        temps.append(plain_copy(reference))
+        reference = temps[-1].name
+
+    try :
+        with open(output, 'rb') as out_f, open(reference, 'rb') as ref_f :
+            out_m = _map(out_f)
+            ref_m = _map(ref_f)
+
+            out_len = _digit_end(out_m)
+            length = min(out_len, _digit_end(ref_m))
+            offset = first_mismatch(out_m, ref_m, length)
+
+            # digits are counted after the decimal point
+            point = ref_m.find(b'.', 0, 64) + 1
+
+            compared = max(out_len - point, 0)
+            correct = max(offset - point, 0)
+            mismatch = max(offset - point + 1, 0) if offset < length else None
+    finally :
+        for t in temps :
+            t.close()
+
+    return VerifyResult(correct, compared, mismatch, time.perf_counter() - start_time)
+
+def verify_value(value, digits : int, reference : str) -> VerifyResult :
+    """Check the first `digits` places of an mpf against the reference"""
+    with tempfile.NamedTemporaryFile('w+', suffix='.txt') as tmp :
+        write_plain(digit_chunks(value, digits), tmp)
+        return verify_files(tmp.name, reference)
+
+def report(result : VerifyResult, reference : str) -> str :
+    if result.mismatch is None :
+        where = f"all {result.compared} digits checked"
+        if result.correct < result.compared :
+            where += f" (reference ends after {result.correct})"
+    else :
+        where = f"first difference at digit {result.mismatch}"
+
+    return f"verified {result.correct} digits against {reference} - {where} ({result.seconds:.3f} secs)"
@@ -1,87 +1,90 @@
 #!/usr/bin/env python
-import argparse
 import datetime
-from mpmath import mp, mpf
-
-from lib.common import BaseCalc, driver
-
-from typing import List, NamedTuple
+import sys
+
+from lib.common import driver
+from lib.backends import BackendCalc, to_mpf
+from lib.formulas import FORMULAS, Formula
+from lib.fixedpoint import fixed_to_mpf
+from lib.machin import MachinTerm, machin_terms
+from lib.planning import arctan_tail_digits
+from lib.cache import CachedCalc, add_cache_args
+from lib.options import options_parser, add_backend_arg, add_digits_arg, add_fixed_arg, add_formula_arg, add_shrink_arg, add_workers_arg, extra_args
+from lib.stages import StagedCalc, add_stage_args
 
 from multiprocessing import Pool
 
 import functools
 
-Params = NamedTuple('Params', factor=int, base=int)
-
-class MachinTerm :
-    def __init__(self, factor, argument) -> None:
-        self.factor = factor
-        self.argument = argument
- 
-        self.power = argument
-        self.partial = argument
-
-        self.arg_squared = argument**2
-        self.sign : int = 1
-        self.k : int = 0
-        self.divisor = mpf(1)
-
-    def compute_term(self) :
-        self.k += 1
-        self.sign *= -1
-        self.divisor += 2
-
-        self.power *= self.arg_squared
-
-        new_term = self.power * self.sign / self.divisor
-        self.partial += new_term
-
-
-
-Parameters = [
-    Params(12, 49),
-    Params(32, 57),
-    Params(-5, 239),
-    Params(12, 110443)
-]
-
-class machin(BaseCalc) :
+class machin(CachedCalc, StagedCalc, BackendCalc) :
     name = 'machin-4-mp'
     description = 'Approximate pi using a "Machin-like" arctan formula with 4 terms'
     
     digits_per_iter = 3.369
 
+    formula : Formula = FORMULAS['takano']
+    fixed : bool = False
+    shrink : bool = False
+
+    # each arctan runs in a process of its own
+    arctan_per_worker = True
+    workers : int = 4
+
+    @classmethod
+    def tail_digits(cls, iterations : int) -> float :
+        # term 0 plus one term per iteration
+        return arctan_tail_digits(cls.formula.terms, iterations + 1)
+
     def __init__(self) -> None:
         super().__init__()
 
-        self.params = [MachinTerm(
-            factor = mpf(p.factor), 
-            argument = mpf(1) / p.base,
-            ) for p in Parameters]
+        self.params, self.needed = machin_terms(self.formula, self.fixed, self.shrink)
 
     def do_machin_term(self, index : int ) :
         t : MachinTerm = self.params[index]
 
         start_time = datetime.datetime.now()
 
-        for i in range(0, self.iterations) :
+        for i in range(0, min(self.iterations, self.needed[index])) :
             t.compute_term()
             if index == 0 and i % self.progress_count == 0 :
-                print(f"{i:6} {datetime.datetime.now() - start_time}")
+                print(f"{i:6} {datetime.datetime.now() - start_time}", file=sys.stderr)
 
         return t.partial * t.factor
 
     def approx_pi(self) :
-        with Pool(5) as p:
-            retvals = p.map(self.do_machin_term, range(0, len(self.params)))
+        return self.cached(lambda : self.run_stages(self.parallel_terms))
+
+    def parallel_terms(self) :
+        with self.phase('terms') :
+            # longest first, so no worker is left with a long one at the end
+            order = sorted(range(0, len(self.params)), key=lambda i : -self.needed[i])
+            with Pool(min(self.workers, len(self.params))) as p:
+                retvals = p.map(self.do_machin_term, order, chunksize=1)
+
+        with self.phase('final') :
+            func = lambda a,b : a+b
+            total = functools.reduce(func, retvals)
+
+            if self.fixed :
+                total = fixed_to_mpf(total, self.params[0].scale)
 
-        func = lambda a,b : a+b
-        pi = mpf(4) * functools.reduce(func, retvals)
+            pi = to_mpf(4 * total)
 
         return pi
     
 
 if __name__ == "__main__" :
+    parser = options_parser()
+    add_stage_args(parser)
+    add_digits_arg(parser)
+    add_cache_args(parser)
+    add_backend_arg(parser)
+    add_fixed_arg(parser)
+    add_formula_arg(parser, 'takano')
+    add_shrink_arg(parser)
+    add_workers_arg(parser, default=0)
+    extra_args(parser, machin)
 
     driver(machin)
 
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+
+#
+# machin-like-4 for runs bigger than memory.
+#
+# The power and the partial sum of every arctan are fixed point numbers
+# in memory mapped files (see lib/outofcore.py) and each term is one
+# pass through them a block at a time, so the memory used is set by
+# --memory and not by the digits. The digits are written out as they
+# are converted, without the whole number ever being in memory either.
+#
+# The files go in --dir (put it on a real disk - /tmp is often memory).
+# They take about 2 * (arctans) * 0.42 bytes per digit and are removed
+# at the end.
+#
+import argparse
+import datetime
+import sys
+import tempfile
+
+from lib.formatter import write_formatted, write_plain
+from lib.formulas import FORMULAS, find_formula, terms_needed
+from lib.progress import Progress, add_progress_arg
+from lib.outofcore import DiskArctan, LimbFile, block_limbs, combine, decimal_digits, limbs_for, peak_rss_kb
+
+name = 'machin-disk'
+description = 'Approximate pi with a "Machin-like" arctan formula, keeping the numbers on disk'
+
+def compute(formula, digits : int, directory : str, budget : int, report_every : float) -> LimbFile :
+    limbs = limbs_for(digits)
+    block = block_limbs(budget)
+
+    params = [DiskArctan(p.factor, p.base, limbs, directory, block) for p in formula.terms]
+    needed = [terms_needed(p.factor, p.base, digits) for p in formula.terms]
+    iterations = max(needed)
+
+    with Progress(iterations, report_every) as progress :
+        for k in range(1, iterations + 1) :
+            for t, n in zip(params, needed) :
+                if t.k < n :
+                    t.compute_term()
+            progress.count = k
+
+    result = LimbFile(f"{directory}/pi.limbs", limbs)
+    combine(params, 4, result, block)
+    for t in params :
+        t.close()
+
+    return result
+
+#--------------------------------------------
+def get_args() :
+    parser = argparse.ArgumentParser(
+                    prog=f"{name}.py",
+                    description=description,
+    )
+
+    parser.add_argument("-n", '--digits', type=int, default=1000,
+                        help="Number of digits past the point to compute")
+    parser.add_argument('--formula', choices=sorted(FORMULAS) + ['auto'], default='takano',
+                        help="Machin-like formula to use ('auto' picks the cheapest for the digits)")
+    parser.add_argument('--dir', default='.',
+                        help="Where to put the number files")
+    parser.add_argument('--memory', type=int, default=256, metavar='MB',
+                        help="Memory for the limb blocks in flight - sets the size of the blocks. "
+                             "Python itself and the page cache come on top of it")
+    parser.add_argument("-f", '--format', choices=['info', 'string'], default='info',
+                        help="Output format - grouped lines ('info') or one long digit string ('string')")
+    add_progress_arg(parser)
+
+    return parser.parse_args()
+
+if __name__ == "__main__" :
+
+    args = get_args()
+    formula = find_formula(args.formula, args.digits)
+    budget = args.memory * 2**20
+    start_time = datetime.datetime.now()
+
+    with tempfile.TemporaryDirectory(prefix='machin-disk-', dir=args.dir) as directory :
+        result = compute(formula, args.digits, directory, budget, args.report_every)
+
+        chunks = decimal_digits(result, args.digits, block_limbs(budget))
+        if args.format == 'info' :
+            write_formatted(chunks)
+        else :
+            write_plain(chunks)
+            print()
+        result.close()
+
+    print(f"formula = {formula.name}", file=sys.stderr)
+    print(f"peak rss = {peak_rss_kb() // 1024} MB (memory = {args.memory} MB)", file=sys.stderr)
+    print(f"total time = {datetime.datetime.now() - start_time}")
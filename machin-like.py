@@ -1,82 +1,42 @@
 #!/usr/bin/env python
 
-from mpmath import mpf
-from lib.common import BaseCalc, driver
-
-from typing import NamedTuple
-
-
-Params = NamedTuple('Params', factor=int, base=int)
-
-#
-# Each branch of a machin-like formula looks like a * arctan(b)
-# factor = a
-# argument = b
-# This class will compute the partial sums for the arctan.
-#
-class MachinTerm :
-    def __init__(self, factor, argument) -> None:
-        self.factor = factor
-        self.argument = argument
-        
-        self.power = argument
-        self.partial = argument
-
-        self.arg_squared = argument**2
-        self.sign : int = 1
-        self.k : int = 0
-        self.divisor = mpf(1)
-
-    def compute_term(self) :
-        self.k += 1
-        self.sign *= -1
-        self.divisor += 2
-
-        self.power *= self.arg_squared
-
-        new_term = self.power * self.sign / self.divisor
-        self.partial += new_term
+from lib.common import driver
+from lib.formulas import FORMULAS, Formula
+from lib.machin import MachinCalc
+from lib.epsilon import EpsilonCalc
+from lib.checkpoint import add_checkpoint_args
+from lib.cluster import add_cluster_args
+from lib.cache import CachedCalc, add_cache_args
+from lib.options import options_parser, add_backend_arg, add_digits_arg, add_fixed_arg, add_formula_arg, add_layers_arg, add_shrink_arg, add_split_arg, add_workers_arg, extra_args
+from lib.stages import StagedCalc, add_stage_args
 
 
 #
-# Store the argument for the arctan inverted.
-# if it is a*arctan(1/b) store (a,b)
+# Each branch of the formula is a MachinTerm (see lib/machin.py)
 #
-Parameters = [
-    Params(6, 8),
-    Params(2, 57),
-    Params(1, 239)
-]
-
-class machin(BaseCalc) :
+class machin(CachedCalc, EpsilonCalc, StagedCalc, MachinCalc) :
     name = 'machin-like'
     description = 'Approximate pi using a "Machin-like" arctan formula'
     
     digits_per_iter = 1.84
 
-    def __init__(self) -> None:
-
-        self.params = [MachinTerm(
-            factor = mpf(p.factor), 
-            argument = mpf(1) / p.base,
-            ) for p in Parameters]
-
-    
-    def add_term(self) :
-
-        for t in self.params :
-            t.compute_term()
-
-    def final_compute(self) :
-        total = mpf(0) 
-        for t in self.params :
-            total += t.partial * t.factor
-
-        return total * 4
-    
+    formula : Formula = FORMULAS['stormer-3']
 
 
 if __name__ == "__main__" :
+    parser = options_parser()
+    add_stage_args(parser)
+    add_digits_arg(parser)
+    add_cache_args(parser)
+    add_backend_arg(parser)
+    add_fixed_arg(parser)
+    add_formula_arg(parser, 'stormer-3')
+    add_shrink_arg(parser)
+    add_split_arg(parser)
+    add_cluster_args(parser)
+    add_layers_arg(parser)
+    add_workers_arg(parser)
+    add_checkpoint_args(parser)
+    extra_args(parser, machin)
 
     driver(machin)
-
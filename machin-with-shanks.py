@@ -3,17 +3,20 @@ import argparse
 import datetime
 from mpmath import mp, mpf, workdps
 
-from typing import List, NamedTuple
+from typing import Optional
+
+from lib.formatter import write_formatted
+from lib.formulas import FORMULAS
+from lib.precision import TermPrecision
+from lib.progress import REPORT_SECONDS, Progress, add_progress_arg
+from lib.radix import digit_chunks
 
 name = 'machin-with-shanks'
 description = 'Approximate pi using a "Machin-like" arctan formula helped with shanks` transform'
 digits_per_iter = 3.4
-count_between_progress = 500
-
-Params = NamedTuple('Params', factor=int, base=int)
 
 class MachinTerm :
-    def __init__(self, factor, argument) -> None:
+    def __init__(self, factor, argument, precision : Optional[TermPrecision] = None) -> None:
         self.factor = factor
         self.argument = argument
         self.nextterm = mpf(0)
@@ -25,15 +28,18 @@ class MachinTerm :
         self.sign : int = 1
         self.k : int = 0
         self.divisor = mpf(1)        
+        self.precision = precision
 
     def compute_term(self) :
         self.k += 1
         self.sign *= -1
         self.divisor += 2
 
-        self.power *= self.argument**2
-
-        new_term = self.power * self.sign / self.divisor
+        if self.precision is not None :
+            self.power, new_term = self.precision.next_term(self.power, self.k, self.sign, self.divisor)
+        else :
+            self.power *= self.argument**2
+            new_term = self.power * self.sign / self.divisor
 
         self.partial += self.nextterm
         self.nextterm = self.nextnextterm
@@ -51,20 +57,16 @@ class MachinTerm :
         with workdps(10) :
             return f"MachineInfo[partial={self.partial}, n={self.nextterm}, nn={self.nextnextterm} ]"
 
-Parameters = [
-    Params(12, 49),
-    Params(32, 57),
-    Params(-5, 239),
-    Params(12,110443)
-]
+Parameters = FORMULAS['takano'].terms
 
 class machin :
-    def __init__(self) -> None:
+    def __init__(self, shrink : bool = False) -> None:
         self.k = 0
 
         self.params = [MachinTerm(
             factor = mpf(p.factor), 
-            argument = mpf(1) / p.base
+            argument = mpf(1) / p.base,
+            precision = TermPrecision(p.base, mp.dps) if shrink else None
             ) for p in Parameters]
 
     
@@ -82,7 +84,7 @@ class machin :
         return total * 4
     
 
-def main(iterations : int = 100) :
+def main(iterations : int = 100, shrink : bool = False, report_every : float = REPORT_SECONDS) :
 
     dps = int(iterations * digits_per_iter ) + 20
     if dps < 1000 :
@@ -90,16 +92,14 @@ def main(iterations : int = 100) :
 
     mp.dps = dps
 
-    C = machin()
+    C = machin(shrink)
 
     start_time = datetime.datetime.now()
 
-    for i in range(0, iterations) :
-        C.add_term()
-        k = C.k
-        if k % count_between_progress == 0 :
-            delta = datetime.datetime.now() - start_time
-            print(f"{k:6} of {iterations} ({delta})")
+    with Progress(iterations, report_every) as progress :
+        for i in range(0, iterations) :
+            C.add_term()
+            progress.count = i + 1
 
 
     pi = C.approx_pi()
@@ -108,42 +108,11 @@ def main(iterations : int = 100) :
     index = int(iterations*digits_per_iter + 2)
     if index < 52 :
         index = 52
-    pi_str : str = str(C.approx_pi())[:index]
-
-    print_digit_string(pi_str)
+    write_formatted(digit_chunks(pi, index - 2))
 
     print(f"{name} iter = {iterations} prec = {precision} ({dps})")
     print(f"total time = {datetime.datetime.now() - start_time}")
 
-#--------------------------------------------
-#
-# Split digits into groups of 10 and then print
-# 10 such groups on a line prefixed with a group counter
-#
-def print_digit_string(digits: str) :
-    # number of digits per group
-    dpg : int = 10
-    # number of groups per line
-    gpl : int = 10
-
-    leading : str = ''
-    trailing : str = ''
-    [leading, trailing] = digits.split('.', 2)
-
-    prefix : str = ' ' * (len(leading)+1)
-
-    groups : List[str] = [trailing[start:start+dpg] for start in range(0, len(trailing), dpg)]
-
-    n : int = 0
-    groups[0] = f"{n:6}|" + leading + '.' + groups[0]
-    for i in range(gpl, len(groups), gpl) :
-        n += gpl
-        groups[i] = f"{n:6}|" + prefix + groups[i]
-
-    for i in range(0, len(groups), gpl) :
-        print(" ".join(groups[i:i+10]))
-
-        
 #--------------------------------------------
 def get_args() :
     parser = argparse.ArgumentParser(
@@ -152,6 +121,9 @@ def get_args() :
     )
 
     parser.add_argument("-i", '--iterations', type=int, default=100)
+    parser.add_argument('--shrink', action='store_true',
+                        help="Compute each arctan term only to the precision it still adds to the sum")
+    add_progress_arg(parser)
 
     return parser.parse_args()
 
@@ -159,5 +131,5 @@ if __name__ == "__main__" :
 
     args = get_args()
 
-    main(args.iterations)
+    main(args.iterations, args.shrink, args.report_every)
 
@@ -2,15 +2,41 @@
 import argparse
 from mpmath import mpf
 
-from lib.common import BaseCalc, driver
+from lib.common import driver
+from lib.backends import BackendCalc, number, to_mpf
+from lib.batch import BatchCalc
+from lib.epsilon import EpsilonCalc
+from lib.checkpoint import ResumableCalc, add_checkpoint_args
+from lib.cache import CachedCalc, add_cache_args
+from lib.options import options_parser, add_backend_arg, add_batch_arg, add_digits_arg, add_layers_arg, add_split_arg, add_workers_arg, extra_args
+from lib.series import Series, SplitCalc
+from lib.planning import alternating_tail_digits
+from lib.stages import StagedCalc, add_stage_args
 
 
-class calculator(BaseCalc) :
+class NilakanthaSeries(Series) :
+    """(-1)^n / ((2n+2)(2n+3)(2n+4))"""
+    def a(self, n : int) -> int :
+        return -1 if n & 1 else 1
+
+    def b(self, n : int) -> int :
+        return (2*n + 2) * (2*n + 3) * (2*n + 4)
+
+
+class calculator(CachedCalc, EpsilonCalc, StagedCalc, BatchCalc, SplitCalc, ResumableCalc, BackendCalc) :
     name = 'nilakantha'
     description = 'Approximate pi using Nilakantha power series'
 
     digits_per_iter = 0.00001
 
+    initial_terms = 0
+
+    @classmethod
+    def tail_digits(cls, iterations : int) -> float :
+        # off by less than the next term, 4 / ((2n+2)(2n+3)(2n+4))
+        sub_n = 2 + 2*iterations
+        return alternating_tail_digits(4 / (sub_n * (sub_n+1) * (sub_n+2)))
+
     def __init__(self) -> None:
 
         # first iteration needs to be "0"
@@ -18,23 +44,56 @@ class calculator(BaseCalc) :
 
         self.sign : int = -1
 
-        self.total_sum = mpf(0)
+        self.total_sum = number(0)
 
     
     def add_term(self) :
 
         self.sign *= -1
-        sub_n = mpf(2+2*self.k)
+        sub_n = 2+2*self.k
         denominator = sub_n *(sub_n+1) * (sub_n+2)
-        new_term = mpf(self.sign) / denominator
+        new_term = number(self.sign) / denominator
         self.total_sum += new_term
 
     def final_compute(self) :
-        return self.total_sum * 4 + 3
+        return to_mpf(self.total_sum * 4 + 3)
+
+    def sum_terms(self, a : int, b : int) :
+        total = mpf(0)
+        for k in range(a, b) :
+            sub_n = 2 + 2*k
+            new_term = mpf(1) / (sub_n * (sub_n+1) * (sub_n+2))
+            if k & 1 :
+                total -= new_term
+            else :
+                total += new_term
+
+        return total
+
+    def batch_terms(self, k) :
+        sub_n = 2.0*k + 2
+        return (1 - 2*(k & 1)) / (sub_n * (sub_n+1) * (sub_n+2))
+
+    def split_series(self) :
+        return [(1, NilakanthaSeries(), self.iterations + self.initial_terms)]
+
+    def final_from_sum(self, total) :
+        return total * 4 + 3
     
 
 
 if __name__ == "__main__" :
+    parser = options_parser()
+    add_stage_args(parser)
+    add_digits_arg(parser)
+    add_cache_args(parser)
+    add_backend_arg(parser)
+    add_layers_arg(parser)
+    add_batch_arg(parser)
+    add_split_arg(parser)
+    add_workers_arg(parser)
+    add_checkpoint_args(parser)
+    extra_args(parser, calculator)
 
     driver(calculator)
 
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+from lib.common import driver
+from lib.backends import BackendCalc, divide, inv_sqrt, number, sqrt, to_mpf
+from lib.cache import CachedCalc, add_cache_args
+from lib.options import options_parser, add_backend_arg, add_digits_arg, extra_args
+from lib.progress import ProgressCalc, add_progress_arg
+from lib.planning import gauss_legendre_tail_digits
+from lib.stages import StagedCalc, add_stage_args
+
+
+class calculator(CachedCalc, StagedCalc, ProgressCalc, BackendCalc) :
+    name = 'salamin-brent'
+    description = 'Approximate pi using the Salamin-Brent arithmetic-geometric mean formula'
+
+    # only the first iteration - see size_by_tail in lib/options.py
+    digits_per_iter = 2.5
+    size_by_tail = True
+
+    @classmethod
+    def tail_digits(cls, iterations : int) -> float :
+        # the same sequence as Gauss-Legendre
+        return gauss_legendre_tail_digits(iterations)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.a = number(1)
+        self.b = inv_sqrt(2)
+        # 1 - sum of 2^(j+1) * c_j^2
+        self.denominator = number(1)
+        self.two_power = 2
+
+    def add_term(self) :
+        """c_j = (a - b) / 2 is how far the means still are apart"""
+        c = (self.a - self.b) / 2
+        self.two_power *= 2
+        self.denominator -= self.two_power * c * c
+
+        self.a, self.b = (self.a + self.b) / 2, sqrt(self.a * self.b)
+
+    def final_compute(self) :
+        # pi = 4 * agm^2 / (1 - sum), with one more mean for agm
+        a = (self.a + self.b) / 2
+        return to_mpf(divide(4 * a * a, self.denominator))
+
+
+if __name__ == "__main__" :
+    parser = options_parser()
+    add_stage_args(parser)
+    add_digits_arg(parser)
+    add_cache_args(parser)
+    add_backend_arg(parser)
+    add_progress_arg(parser)
+    extra_args(parser, calculator)
+
+    driver(calculator)
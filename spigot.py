@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+#
+# Stream the digits of pi as they are found.
+#
+# Every other calculator only has its digits once the whole run is
+# done. This one hands them out as they become final (see
+# lib/spigot.py), so they can be watched or piped somewhere else
+# straight away. Without -n it keeps going until it is interrupted.
+#
+# The number of digits so far and the rate are written to stderr.
+#
+import argparse
+import datetime
+import sys
+import time
+from typing import Iterable, Iterator, Optional
+
+from lib.formatter import write_formatted, write_plain
+from lib.progress import add_progress_arg
+from lib.spigot import pi_digits
+
+name = 'spigot'
+description = "Stream the digits of pi using Gibbons' unbounded spigot on Gosper's series"
+
+def report(digits : int, elapsed : float) -> None :
+    print(f"{digits:10} digits {digits / elapsed:10.0f} digits/sec "
+          f"({datetime.timedelta(seconds=elapsed)})", file=sys.stderr)
+
+def metered(chunks : Iterable[str], digits : Optional[int], every : float) -> Iterator[str] :
+    """Pass the chunks on (cut off after `digits` digits past the point)
+    and report the digits per second every `every` seconds"""
+    start = last = time.perf_counter()
+    # '3.' are not digits after the point
+    wanted = None if digits is None else digits + 2
+    count = 0
+
+    try :
+        for chunk in chunks :
+            if wanted is not None and count + len(chunk) >= wanted :
+                chunk = chunk[:wanted - count]
+
+            count += len(chunk)
+            yield chunk
+
+            now = time.perf_counter()
+            if now - last >= every :
+                report(count - 2, now - start)
+                last = now
+
+            if wanted is not None and count >= wanted :
+                break
+    except KeyboardInterrupt :
+        pass
+
+    report(max(count - 2, 0), time.perf_counter() - start)
+
+#--------------------------------------------
+def get_args() :
+    parser = argparse.ArgumentParser(
+                    prog=f"{name}.py",
+                    description=description,
+    )
+
+    parser.add_argument("-n", '--digits', type=int, default=None,
+                        help="Stop after this many digits past the point (default never)")
+    parser.add_argument("-f", '--format', choices=['info', 'string'], default='info',
+                        help="Output format - grouped lines ('info') or one long digit string ('string')")
+    add_progress_arg(parser)
+
+    return parser.parse_args()
+
+if __name__ == "__main__" :
+
+    args = get_args()
+
+    chunks = metered(pi_digits(), args.digits, args.report_every)
+
+    # write each line (or chunk) as soon as it is complete
+    if args.format == 'info' :
+        write_formatted(chunks, lines_per_write=1)
+    else :
+        write_plain(chunks, block_size=1)
+        print()
@@ -0,0 +1,68 @@
+import os
+import pickle
+import stat
+
+from mpmath import mp, mpf, workdps
+
+from lib.cache import FILE_MODE, ResultCache, read_value
+
+def test_round_trip(tmp_path) :
+    cache = ResultCache(str(tmp_path))
+    with workdps(150) :
+        assert cache.store(+mp.pi, 120, 'test') == 120
+
+        f, verified = cache.lookup(100)
+        assert verified == 120
+        assert abs(read_value(f, 100) - mp.pi) < mpf(10)**-100
+
+    assert cache.lookup(121) is None
+
+def test_wrong_digits_are_not_verified(tmp_path) :
+    cache = ResultCache(str(tmp_path))
+    with workdps(50) :
+        # 3.14159999... in binary - right up to the 5th place
+        assert cache.store(mpf('3.1416'), 20, 'test') == 5
+    assert cache.lookup(6) is None
+
+def test_objects_are_readable_by_others(tmp_path) :
+    cache = ResultCache(str(tmp_path))
+    with workdps(50) :
+        cache.store(+mp.pi, 40, 'test')
+
+    for name in os.listdir(cache.objects) :
+        mode = stat.S_IMODE(os.stat(os.path.join(cache.objects, name)).st_mode)
+        assert mode == FILE_MODE
+
+def test_least_recently_used_goes_first(tmp_path) :
+    # room for two of the results below, not three
+    cache = ResultCache(str(tmp_path), limit=2500)
+    with workdps(1100) :
+        cache.store(+mp.pi, 1000, 'first')
+        cache.store(+mp.pi, 1001, 'second')
+        # using the first one makes the second the oldest
+        f, _ = cache.lookup(1000)
+        f.close()
+        cache.store(+mp.pi, 1002, 'third')
+
+    with cache._locked() as index :
+        kept = sorted(e['places'] for e in index.values())
+    assert kept == [1000, 1002]
+    assert len(os.listdir(cache.objects)) == 2
+
+def write_checkpoint(path, iterations : int, dps : int) -> None :
+    with open(path, 'wb') as f :
+        pickle.dump({'name' : 'test', 'dps' : dps,
+                     'state' : {'start_k' : 1, 'next_k' : 1 + iterations}}, f)
+
+def test_closest_checkpoint(tmp_path) :
+    cache = ResultCache(str(tmp_path / 'cache'))
+    for iterations, dps in ((100, 500), (300, 500), (400, 100)) :
+        path = cache.work_file('.ckpt')
+        write_checkpoint(path, iterations, dps)
+        cache.store_checkpoint(path, 'config')
+
+    to = str(tmp_path / 'seed.ckpt')
+    # the one made at too low a precision is passed over
+    assert cache.closest_checkpoint('config', 500, 400, to) == 300
+    assert cache.closest_checkpoint('config', 200, 400, to) == 100
+    assert cache.closest_checkpoint('other', 500, 400, to) is None
@@ -0,0 +1,44 @@
+from mpmath import mp, mpf, workdps
+
+from lib.epsilon import WynnEpsilon
+
+def leibniz_sums(terms : int) :
+    """4 * the partial sums of 1 - 1/3 + 1/5 - ..."""
+    total = mpf(0)
+    for k in range(terms) :
+        total += mpf(-4 if k & 1 else 4) / (2*k + 1)
+        yield total
+
+def test_one_layer_sums_a_geometric_series() :
+    # Shanks' transform of order 1 is exact for a geometric series
+    with workdps(50) :
+        table = WynnEpsilon(1)
+        total = mpf(0)
+        for k in range(5) :
+            total += mpf(1) / 3**k
+            table.add(total)
+
+        assert abs(table.estimate() - mpf(3) / 2) < mpf(10)**-45
+
+def test_layers_accelerate_leibniz() :
+    with workdps(200) :
+        plain = WynnEpsilon(0)
+        table = WynnEpsilon(10)
+        for total in leibniz_sums(2000) :
+            plain.add(total)
+            table.add(total)
+
+        assert abs(plain.estimate() - mp.pi) > mpf(10)**-4
+        assert abs(table.estimate() - mp.pi) < mpf(10)**-55
+
+def test_error_estimate_covers_the_error() :
+    with workdps(200) :
+        table = WynnEpsilon(5)
+        assert table.error() is None
+
+        for total in leibniz_sums(1000) :
+            table.add(total)
+
+        error = table.error()
+        assert error is not None and error > 0
+        assert abs(table.estimate() - mp.pi) < error
@@ -0,0 +1,65 @@
+import os
+
+import pytest
+from mpmath import mpf, workdps
+
+from lib.binsplit import chudnovsky_pi, chudnovsky_split
+from lib.formulas import FORMULAS
+from lib.planning import (PLAN_GUARD_DIGITS, arctan_tail_digits,
+                          chudnovsky_tail_digits, plan)
+from lib.radix import digit_chunks
+
+REFERENCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         'pi-digits-string.txt')
+
+with open(REFERENCE) as f :
+    PI = f.read().strip()
+
+class MachinPlan :
+    formula = FORMULAS['machin']
+
+    @classmethod
+    def tail_digits(cls, iterations : int) -> float :
+        # term 0 plus one term per iteration, as machin-like counts them
+        return arctan_tail_digits(cls.formula.terms, iterations + 1)
+
+    @classmethod
+    def compute(cls, iterations : int) :
+        total = mpf(0)
+        for p in cls.formula.terms :
+            power = mpf(1) / p.base
+            for k in range(iterations + 1) :
+                term = power / (2*k + 1)
+                total += -p.factor * term if k & 1 else p.factor * term
+                power /= p.base * p.base
+        return 4 * total
+
+class ChudnovskyPlan :
+    @classmethod
+    def tail_digits(cls, iterations : int) -> float :
+        return chudnovsky_tail_digits(iterations + 1)
+
+    @classmethod
+    def compute(cls, iterations : int) :
+        _, q, t = chudnovsky_split(0, iterations + 1)
+        return chudnovsky_pi(q, t)
+
+@pytest.mark.parametrize('calc', [MachinPlan, ChudnovskyPlan])
+@pytest.mark.parametrize('digits', [10, 50, 199, 200, 1000])
+def test_plan_gives_the_digits(calc, digits) :
+    iterations, dps = plan(calc, digits)
+
+    with workdps(dps) :
+        value = calc.compute(iterations)
+        text = ''.join(digit_chunks(value, digits))
+
+    assert text == PI[:digits + 2]
+
+@pytest.mark.parametrize('calc', [MachinPlan, ChudnovskyPlan])
+@pytest.mark.parametrize('digits', [10, 200, 5000])
+def test_plan_is_the_fewest_iterations(calc, digits) :
+    iterations, dps = plan(calc, digits)
+
+    assert calc.tail_digits(iterations) >= digits + PLAN_GUARD_DIGITS
+    assert iterations == 1 or calc.tail_digits(iterations - 1) < digits + PLAN_GUARD_DIGITS
+    assert dps > digits + PLAN_GUARD_DIGITS
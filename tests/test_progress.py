@@ -0,0 +1,51 @@
+import io
+import time
+
+import pytest
+
+from lib.progress import Progress, fit_power
+
+def test_fit_power_finds_the_power() :
+    samples = [(n, 0.5 * n**1.5) for n in (10, 100, 1000, 5000)]
+    c, p = fit_power(samples)
+    assert c == pytest.approx(0.5)
+    assert p == pytest.approx(1.5)
+
+def test_fit_power_needs_two_points() :
+    assert fit_power([]) is None
+    assert fit_power([(10, 1.0)]) is None
+    assert fit_power([(10, 1.0), (10, 2.0)]) is None
+
+def test_reports_go_to_stderr(capsys) :
+    progress = Progress(100, every=0, unit='blocks')
+    with progress :
+        progress.count = 40
+        progress.report()
+
+    out, err = capsys.readouterr()
+    assert out == ''
+    assert '40 of 100' in err and 'blocks/sec' in err
+
+def test_eta_after_two_reports() :
+    out = io.StringIO()
+    progress = Progress(100, every=0, out=out)
+    with progress :
+        for count in (10, 20) :
+            time.sleep(0.01)
+            progress.count = count
+            progress.report()
+
+    lines = out.getvalue().splitlines()
+    assert 'eta' not in lines[0]
+    assert 'eta' in lines[1]
+    assert progress.estimate() > 0
+
+def test_thread_reports_while_the_loop_runs() :
+    out = io.StringIO()
+    with Progress(10, every=0.01, out=out) as progress :
+        for count in range(1, 11) :
+            progress.count = count
+            time.sleep(0.01)
+
+    assert progress.thread is not None and not progress.thread.is_alive()
+    assert ' of 10 ' in out.getvalue()
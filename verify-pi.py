@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+
+#
+# Check the digits a calculator printed against a reference file.
+# Either file can be a plain digit string or in the formatted layout.
+#
+import argparse
+import os
+
+from lib.verify import report, verify_files
+
+DEFAULT_REFERENCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pi-digits-formatted.txt')
+
+def get_args() :
+    parser = argparse.ArgumentParser(
+                    prog="verify-pi.py",
+                    description="Check computed digits of pi against a reference file",
+    )
+
+    parser.add_argument('output', help="File holding the computed digits")
+    parser.add_argument("-r", '--reference', default=DEFAULT_REFERENCE,
+                        help="File holding the known digits")
+
+    return parser.parse_args()
+
+if __name__ == "__main__" :
+
+    args = get_args()
+
+    result = verify_files(args.output, args.reference)
+    print(report(result, args.reference))